@@ -0,0 +1,155 @@
+"""Admission control for the bcrypt-bound auth endpoints"""
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from metrics import auth_admission_rejections, auth_requests_in_flight
+
+class AdmissionRejected(Exception):
+    """Raised when an auth request is shed before it reaches the password pool"""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at rate_per_minute, holding at most burst tokens
+
+    Buckets are kept for the max_keys most recently seen keys; an evicted key
+    simply starts again with a full bucket. A rate of 0 disables the limiter.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 100000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.burst > 0
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for key; returns 0 if admitted, else seconds until one is available"""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class AuthAdmission:
+    """Rate limits and a concurrency cap in front of login and registration
+
+    Each request takes a token from its client IP's bucket and its email's
+    bucket (429 when either is empty), then one of max_concurrent slots
+    (503 when all are taken). Both answer immediately with Retry-After, so
+    a credential-stuffing run or registration rush is turned away before it
+    can queue bcrypt work and starve the rest of the API. State is per
+    worker, so the effective limits scale with WEB_CONCURRENCY.
+    """
+
+    def __init__(self, max_concurrent: int, ip_limiter: TokenBucketLimiter, email_limiter: TokenBucketLimiter):
+        self.max_concurrent = max_concurrent
+        self.ip_limiter = ip_limiter
+        self.email_limiter = email_limiter
+        self._in_flight = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+
+    def _reject(self, route: str, reason: str, status_code: int, retry_after: float) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        auth_admission_rejections.inc(route=route, reason=reason)
+        return AdmissionRejected(reason, status_code, max(1, math.ceil(retry_after)))
+
+    @asynccontextmanager
+    async def admit(self, route: str, client_ip: Optional[str], email: str) -> AsyncIterator[None]:
+        """Hold an auth slot for the duration of the block, or raise AdmissionRejected"""
+        wait = self.ip_limiter.acquire(client_ip or "unknown")
+        if wait:
+            raise self._reject(route, "ip_rate", 429, wait)
+        wait = self.email_limiter.acquire(email.strip().lower())
+        if wait:
+            raise self._reject(route, "email_rate", 429, wait)
+        if self.max_concurrent > 0 and self._in_flight >= self.max_concurrent:
+            raise self._reject(route, "concurrency", 503, 1)
+
+        self._in_flight += 1
+        self.admitted += 1
+        auth_requests_in_flight.inc(route=route)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            auth_requests_in_flight.dec(route=route)
+
+    def record_busy(self, route: str):
+        """Count a request the password pool itself turned away"""
+        self.rejected["password_pool"] = self.rejected.get("password_pool", 0) + 1
+        auth_admission_rejections.inc(route=route, reason="password_pool")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self._in_flight,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "ip_rate_per_minute": self.ip_limiter.rate * 60,
+            "email_rate_per_minute": self.email_limiter.rate * 60,
+            "tracked_ips": len(self.ip_limiter),
+            "tracked_emails": len(self.email_limiter)
+        }
+
+def forwarded_client_ip(forwarded_for: Optional[str], peer: Optional[str], trusted_hops: int) -> Optional[str]:
+    """Client address as seen by the outermost of trusted_hops proxies
+
+    Each proxy appends the address it received the request from, so only the
+    last trusted_hops entries of X-Forwarded-For are written by our own
+    infrastructure; anything to their left came from the client and is
+    ignored. With no trusted hops (or a short header) the direct peer is used.
+    """
+    if trusted_hops <= 0 or not forwarded_for:
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    if len(hops) < trusted_hops:
+        return peer
+    return hops[-trusted_hops]
+
+# Number of reverse proxies in front of the app whose X-Forwarded-For entries are trusted
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+
+_max_keys = int(os.getenv("AUTH_RATE_LIMIT_MAX_KEYS", 100000))
+
+# Global admission controller for /auth/login and /auth/register
+auth_admission = AuthAdmission(
+    # Matches the password pool's queue, so admitted requests rarely hit PasswordPoolBusy
+    max_concurrent=int(os.getenv("AUTH_MAX_CONCURRENT", 16)),
+    ip_limiter=TokenBucketLimiter(
+        float(os.getenv("AUTH_IP_RATE_PER_MINUTE", 30)),
+        int(os.getenv("AUTH_IP_BURST", 10)),
+        _max_keys
+    ),
+    email_limiter=TokenBucketLimiter(
+        float(os.getenv("AUTH_EMAIL_RATE_PER_MINUTE", 6)),
+        int(os.getenv("AUTH_EMAIL_BURST", 5)),
+        _max_keys
+    )
+)
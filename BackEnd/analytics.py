@@ -0,0 +1,442 @@
+"""Optional in-memory columnar snapshot of submissions and ratings for read queries
+
+When enabled, each worker loads class_submissions and professor_ratings into
+typed NumPy columns with dictionary-encoded major, class_code and professor,
+keeps them current by re-reading recent writes, and answers rankings, major
+stats and the majors list without aggregating in MongoDB.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from distributions import histogram_matrix
+
+ANALYTICS_SNAPSHOT_ENABLED = os.getenv("ANALYTICS_SNAPSHOT_ENABLED", "false").lower() == "true"
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", 5))
+# Refreshes re-read this far behind the previous pass, to cover writes that
+# were in flight (or stamped by a worker with a slightly slow clock)
+ANALYTICS_REFRESH_OVERLAP_SECONDS = float(os.getenv("ANALYTICS_REFRESH_OVERLAP_SECONDS", 5))
+ANALYTICS_LOAD_BATCH_SIZE = int(os.getenv("ANALYTICS_LOAD_BATCH_SIZE", 10000))
+
+# Row keys pack three dictionary codes into one int64: the user id (the first
+# key field of both tables) gets 31 bits, the class code, major or professor 16
+_KEY_BITS = (31, 16, 16)
+# Rows upserted since the last merge are found through a dict; past this many
+# (or a quarter of the sorted keys) they are merged into the sorted arrays
+_RECENT_KEYS_MIN = 65536
+
+class Dictionary:
+    """Two-way mapping between strings and dense integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+class Column:
+    """Growable typed array; view() is the filled prefix"""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: Sequence):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, len(self._data) * 2), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    def assign(self, rows: Sequence[int], values: Sequence):
+        self._data[np.asarray(rows, dtype=np.int64)] = values
+
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+class ColumnTable:
+    """Rows of (major, class_code, professor, value) with upserts by the collection's unique key
+
+    key_fields name the collection's unique index; rows are found by packing
+    the fields' dictionary codes into a single int64. Keys live in a sorted
+    NumPy array (with their row numbers alongside) searched with
+    np.searchsorted, plus a small dict of keys added since the last merge,
+    so the key map costs about 12 bytes per row instead of a dict entry.
+    """
+
+    def __init__(self, value_field: str, value_dtype, key_fields: Tuple[str, str, str],
+                 dictionaries: Dict[str, Dictionary]):
+        self.value_field = value_field
+        self.key_fields = key_fields
+        self.dictionaries = dictionaries
+        self.major = Column(np.int16)
+        self.class_code = Column(np.int32)
+        self.professor = Column(np.int32)
+        self.value = Column(value_dtype)
+        self._sorted_keys = np.zeros(0, dtype=np.int64)
+        self._sorted_rows = np.zeros(0, dtype=np.int32)
+        self._recent: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.value.size
+
+    def _key(self, doc: Dict[str, Any]) -> int:
+        key = 0
+        for field, bits in zip(self.key_fields, _KEY_BITS):
+            code = self.dictionaries[field].encode(doc[field])
+            if code >> bits:
+                raise ValueError(f"Too many distinct {field} values for the analytics snapshot")
+            key = (key << bits) | code
+        return key
+
+    def _sorted_lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Row of each key among the merged keys, or -1"""
+        if not len(self._sorted_keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self._sorted_keys) - 1)
+        found = self._sorted_keys[positions] == keys
+        return np.where(found, self._sorted_rows[positions], -1)
+
+    def compact(self):
+        """Merge the recently added keys into the sorted arrays"""
+        if not self._recent:
+            return
+        keys = np.fromiter(self._recent.keys(), dtype=np.int64, count=len(self._recent))
+        rows = np.fromiter(self._recent.values(), dtype=np.int32, count=len(self._recent))
+        keys = np.concatenate((self._sorted_keys, keys))
+        rows = np.concatenate((self._sorted_rows, rows))
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._sorted_rows = rows[order]
+        self._recent = {}
+
+    def upsert(self, docs: Sequence[Dict[str, Any]]) -> int:
+        """Insert new rows and overwrite rows whose unique key is already present"""
+        majors = self.dictionaries["major"]
+        class_codes = self.dictionaries["class_code"]
+        professors = self.dictionaries["professor"]
+
+        keys = [self._key(doc) for doc in docs]
+        merged_rows = self._sorted_lookup(np.array(keys, dtype=np.int64)).tolist()
+
+        new_rows: List[Tuple[int, int, int, Any]] = []
+        updated_rows: List[int] = []
+        updated: List[Tuple[int, int, int, Any]] = []
+        for doc, key, index in zip(docs, keys, merged_rows):
+            row = (majors.encode(doc["major"]), class_codes.encode(doc["class_code"]),
+                   professors.encode(doc["professor"]), doc[self.value_field])
+            if index < 0:
+                index = self._recent.get(key)
+            if index is None:
+                self._recent[key] = len(self) + len(new_rows)
+                new_rows.append(row)
+            else:
+                updated_rows.append(index)
+                updated.append(row)
+
+        for column, values in zip((self.major, self.class_code, self.professor, self.value), zip(*new_rows)):
+            column.extend(values)
+        for column, values in zip((self.major, self.class_code, self.professor, self.value), zip(*updated)):
+            column.assign(updated_rows, values)
+
+        if len(self._recent) >= max(_RECENT_KEYS_MIN, len(self._sorted_keys) // 4):
+            self.compact()
+        return len(new_rows) + len(updated)
+
+    def memory(self) -> Dict[str, int]:
+        """Bytes held by the columns and (approximately) by the key-to-row map"""
+        columns = self.major.nbytes + self.class_code.nbytes + self.professor.nbytes + self.value.nbytes
+        # The sorted arrays, plus hash table slots and int objects for each recent key
+        key_map = self._sorted_keys.nbytes + self._sorted_rows.nbytes + len(self._recent) * (3 * 8 + 2 * 32) + 64
+        return {"columns": columns, "key_map": key_map}
+
+class AnalyticsSnapshot:
+    """Columnar copy of class_submissions and professor_ratings"""
+
+    def __init__(self):
+        self.ready = False
+        # Bumped whenever rows change in this process
+        self.generation = 0
+        # Shared major_versions the snapshot has caught up to: it holds every
+        # write made before each major reached its version here
+        self.versions: Dict[str, int] = {}
+        self._reset()
+        self._submissions_collection = None
+        self._ratings_collection = None
+        self._versions_collection = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_refresh_ms = 0.0
+        self.last_load_seconds = 0.0
+
+    def _reset(self):
+        self.dictionaries = {name: Dictionary() for name in ("major", "class_code", "professor", "user_id")}
+        self.submissions = ColumnTable("difficulty_rating", np.int8, ("user_id", "class_code", "major"), self.dictionaries)
+        self.ratings = ColumnTable("rating", np.float32, ("user_id", "professor", "class_code"), self.dictionaries)
+        self.class_names: Dict[Tuple[int, int], str] = {}
+        self._watermark: Optional[datetime] = None
+
+    # --- Loading ---
+
+    def apply_submissions(self, docs: Sequence[Dict[str, Any]]):
+        """Fold written class submissions into the snapshot"""
+        if not docs:
+            return
+        self.submissions.upsert(docs)
+        for doc in docs:
+            key = (self.dictionaries["major"].encode(doc["major"]), self.dictionaries["class_code"].encode(doc["class_code"]))
+            self.class_names[key] = doc["class_name"]
+        self.generation += 1
+
+    def apply_ratings(self, docs: Sequence[Dict[str, Any]]):
+        """Fold written professor ratings into the snapshot"""
+        if not docs:
+            return
+        self.ratings.upsert(docs)
+        self.generation += 1
+
+    def compact(self):
+        """Merge both tables' recent keys into their sorted key arrays"""
+        self.submissions.compact()
+        self.ratings.compact()
+
+    async def _read(self, collection, table_docs, query: Dict[str, Any], fields: Sequence[str]) -> int:
+        projection = {field: True for field in fields}
+        projection["_id"] = False
+        batch = []
+        read = 0
+        async for doc in collection.find(query, projection, batch_size=ANALYTICS_LOAD_BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= ANALYTICS_LOAD_BATCH_SIZE:
+                table_docs(batch)
+                read += len(batch)
+                batch = []
+                # Let requests run between batches of a long load
+                await asyncio.sleep(0)
+        table_docs(batch)
+        return read + len(batch)
+
+    async def _read_versions(self) -> Dict[str, int]:
+        if self._versions_collection is None:
+            return {}
+        return {doc["_id"]: doc["version"] async for doc in self._versions_collection.find({}, {"version": True})}
+
+    async def _pass(self, since: Optional[datetime]) -> int:
+        query = {"submitted_at": {"$gte": since}} if since else {}
+        started_at = datetime.utcnow()
+        # Versions are bumped after their writes land, so reading them first
+        # guarantees the pass below sees everything they account for
+        versions = await self._read_versions()
+        read = await self._read(
+            self._submissions_collection, self.apply_submissions, query,
+            ("major", "class_code", "class_name", "professor", "difficulty_rating", "user_id")
+        )
+        read += await self._read(
+            self._ratings_collection, self.apply_ratings, query,
+            ("major", "class_code", "professor", "rating", "user_id")
+        )
+        self._watermark = started_at - timedelta(seconds=ANALYTICS_REFRESH_OVERLAP_SECONDS)
+        self.versions = versions
+        return read
+
+    async def load(self):
+        """Load both collections from scratch into a new snapshot, then swap it in"""
+        started = time.perf_counter()
+        fresh = AnalyticsSnapshot()
+        fresh._submissions_collection = self._submissions_collection
+        fresh._ratings_collection = self._ratings_collection
+        fresh._versions_collection = self._versions_collection
+        await fresh._pass(None)
+        fresh.compact()
+        # Queries keep using the old columns until the new ones are complete; writes
+        # applied to the old ones meanwhile are re-read by the next refresh
+        self.dictionaries = fresh.dictionaries
+        self.submissions = fresh.submissions
+        self.ratings = fresh.ratings
+        self.class_names = fresh.class_names
+        self._watermark = fresh._watermark
+        self.versions = fresh.versions
+        self.generation += 1
+        self.last_load_seconds = round(time.perf_counter() - started, 2)
+        self.ready = True
+        print(f"📊 Analytics snapshot loaded {len(self.submissions):,} submissions and "
+              f"{len(self.ratings):,} ratings in {self.last_load_seconds}s")
+
+    async def refresh(self):
+        """Apply writes made since the previous pass, reloading if rows were removed"""
+        started = time.perf_counter()
+        submissions = await self._submissions_collection.estimated_document_count()
+        ratings = await self._ratings_collection.estimated_document_count()
+        if submissions < len(self.submissions) or ratings < len(self.ratings):
+            # Collections were reset (e.g. by initialize_data.py); upserts can't express deletes
+            await self.load()
+        else:
+            await self._pass(self._watermark)
+        self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def start(self, submissions_collection, ratings_collection, versions_collection, interval: float):
+        """Load the snapshot in the background, then refresh it every interval seconds"""
+        if self._task is not None:
+            return
+        self._submissions_collection = submissions_collection
+        self._ratings_collection = ratings_collection
+        self._versions_collection = versions_collection
+
+        async def run():
+            while True:
+                try:
+                    if self.ready:
+                        await self.refresh()
+                    else:
+                        await self.load()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Analytics snapshot refresh failed: {e}")
+                await asyncio.sleep(interval)
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # --- Queries ---
+
+    def majors(self) -> List[str]:
+        """Majors with at least one class submission"""
+        counts = np.bincount(self.submissions.major.view(), minlength=len(self.dictionaries["major"]))
+        return sorted(self.dictionaries["major"].values[code] for code in np.nonzero(counts)[0])
+
+    def _class_totals(self, major: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(mask, class codes present, their difficulty sums, their counts) for a major"""
+        code = self.dictionaries["major"].lookup(major)
+        mask = self.submissions.major.view() == (code if code is not None else -1)
+        class_codes = self.submissions.class_code.view()[mask]
+        n_classes = len(self.dictionaries["class_code"])
+        counts = np.bincount(class_codes, minlength=n_classes)
+        sums = np.bincount(class_codes, weights=self.submissions.value.view()[mask], minlength=n_classes)
+        present = np.nonzero(counts)[0]
+        return mask, present, sums[present], counts[present]
+
+    def class_rollups(self, major: str, limit: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The rows class_rankings_pipeline and professor_rollups_filter would return for a major"""
+        mask, present, sums, counts = self._class_totals(major)
+        if not len(present):
+            return [], []
+        average = sums / counts
+        top = np.argsort(-average, kind="stable")[:limit]
+        top_classes = present[top]
+
+        major_code = self.dictionaries["major"].lookup(major)
+        class_values = self.dictionaries["class_code"].values
+        professor_values = self.dictionaries["professor"].values
+        n_professors = len(professor_values)
+
+        # (ranked class, professor) cells: which professors each class's submissions
+        # name, and the rating sums and counts within the major
+        submission_rows = np.flatnonzero(mask)
+        rank, ranked = self._rank_of(top_classes, self.submissions.class_code.view()[submission_rows])
+        cells = rank[ranked] * n_professors + self.submissions.professor.view()[submission_rows][ranked]
+        taught = np.bincount(cells, minlength=len(top_classes) * n_professors).reshape(len(top_classes), -1)
+
+        rating_rows = np.flatnonzero(self.ratings.major.view() == major_code)
+        rank, ranked = self._rank_of(top_classes, self.ratings.class_code.view()[rating_rows])
+        cells = rank[ranked] * n_professors + self.ratings.professor.view()[rating_rows][ranked]
+        size = len(top_classes) * n_professors
+        rating_sums = np.bincount(cells, weights=self.ratings.value.view()[rating_rows][ranked], minlength=size)
+        rating_counts = np.bincount(cells, minlength=size)
+
+        results = []
+        for i, (position, class_code) in enumerate(zip(top.tolist(), top_classes.tolist())):
+            results.append({
+                "class_code": class_values[class_code],
+                "class_name": self.class_names.get((major_code, class_code), class_values[class_code]),
+                "major": major,
+                "average_difficulty": float(average[position]),
+                "submission_count": int(counts[position]),
+                "professors": [professor_values[p] for p in np.flatnonzero(taught[i]).tolist()]
+            })
+
+        professor_docs = [
+            {
+                "class_code": class_values[top_classes[cell // n_professors]],
+                "professor": professor_values[cell % n_professors],
+                "rating_sum": float(rating_sums[cell]),
+                "rating_count": int(rating_counts[cell])
+            }
+            for cell in np.flatnonzero(rating_counts).tolist()
+        ]
+        return results, professor_docs
+
+    @staticmethod
+    def _rank_of(top_classes: np.ndarray, class_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Position of each class code within top_classes, and whether it is there at all"""
+        order = np.argsort(top_classes)
+        ordered = top_classes[order]
+        positions = np.minimum(np.searchsorted(ordered, class_codes), len(ordered) - 1)
+        return order[positions], ordered[positions] == class_codes
+
+    def major_totals(self, major: str) -> Tuple[int, float]:
+        """(classes with submissions, overall average difficulty) for a major"""
+        _, present, sums, counts = self._class_totals(major)
+        if not len(present):
+            return 0, 0.0
+        return len(present), float(sums.sum() / counts.sum())
+
+    def difficulty_histograms(self, major: str) -> Tuple[List[str], np.ndarray]:
+        """Class codes of a major and their (classes x 10) difficulty histograms"""
+        mask, present, _, _ = self._class_totals(major)
+        class_codes = self.submissions.class_code.view()[mask]
+        # Renumber the major's classes densely before histogramming
+        dense = np.searchsorted(present, class_codes)
+        histograms = histogram_matrix(
+            dense, self.submissions.value.view()[mask], np.ones(len(dense)), len(present)
+        )
+        class_values = self.dictionaries["class_code"].values
+        return [class_values[code] for code in present.tolist()], histograms
+
+    def stats(self) -> Dict[str, Any]:
+        submissions = self.submissions.memory()
+        ratings = self.ratings.memory()
+        return {
+            "ready": self.ready,
+            "generation": self.generation,
+            "submissions": len(self.submissions),
+            "ratings": len(self.ratings),
+            "dictionary_sizes": {name: len(dictionary) for name, dictionary in self.dictionaries.items()},
+            "column_bytes": submissions["columns"] + ratings["columns"],
+            "key_map_bytes": submissions["key_map"] + ratings["key_map"],
+            "last_load_seconds": self.last_load_seconds,
+            "last_refresh_ms": self.last_refresh_ms
+        }
+
+# Global snapshot, started in the app lifespan when ANALYTICS_SNAPSHOT_ENABLED is set
+analytics_snapshot = AnalyticsSnapshot()
@@ -1,6 +1,6 @@
 """Authentication and user management models"""
 from pydantic import BaseModel, validator, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 import re
 
@@ -151,6 +151,26 @@ class ProfessorRating(BaseModel):
             raise ValueError('Review too long (max 1000 characters)')
         return v.strip() if v else ""
 
+class BatchSubmission(BaseModel):
+    # Items are told apart by their fields: difficulty_rating or rating
+    items: List[Union[ClassDifficultySubmission, ProfessorRating]]
+    
+    @validator('items')
+    def validate_items(cls, v):
+        if not v:
+            raise ValueError('At least one submission is required')
+        if len(v) > 50:
+            raise ValueError('Too many submissions in one batch (max 50)')
+        return v
+
+class DifficultyDistribution(BaseModel):
+    histogram: List[int]  # Rating counts for difficulty 1 through 10
+    median: float
+    p25: float
+    p75: float
+    std_dev: float
+    hard_share: float  # Share of ratings that are 9 or 10
+
 class ClassRanking(BaseModel):
     class_code: str
     class_name: str
@@ -158,9 +178,37 @@ class ClassRanking(BaseModel):
     average_difficulty: float
     total_submissions: int
     professors: List[dict]  # [{name: str, avg_rating: float, rating_count: int}]
+    distribution: Optional[DifficultyDistribution] = None
+
+class SemesterDifficulty(BaseModel):
+    semester: str
+    submission_count: int
+    average_difficulty: float
+    histogram: List[int]  # Rating counts for difficulty 1 through 10
+
+class DifficultyTrend(BaseModel):
+    major: str
+    class_code: Optional[str] = None  # None for a whole-major trend
+    class_name: Optional[str] = None
+    semesters: List[SemesterDifficulty]  # Oldest first
 
 class MajorStats(BaseModel):
     major: str
     total_classes: int
     total_users: int
-    average_difficulty: float
\ No newline at end of file
+    average_difficulty: float
+
+class ProfessorSummary(BaseModel):
+    professor: str
+    average_rating: float
+    rating_count: int
+    histogram: Dict[str, int]  # {"1.0": count, "1.5": count, ..., "5.0": count}
+    classes: List[dict]  # [{class_code: str, average_rating: float, rating_count: int}]
+
+class SearchResult(BaseModel):
+    kind: str  # "class" or "professor"
+    name: str
+    class_code: Optional[str] = None
+    class_name: Optional[str] = None
+    majors: List[str]
+    count: int  # Difficulty submissions for classes, ratings for professors
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Memory and query latency of the columnar analytics snapshot
+
+Loads synthetic submissions and ratings into an AnalyticsSnapshot to report
+bytes per million rows (columns and the upsert key map separately) and the
+latency of rankings, major stats and the majors list served from memory.
+With --mongo, the same queries are also timed against the rollup path of a
+seeded database, and the snapshot is loaded from that database instead.
+
+    python benchmarks/bench_analytics.py --rows 1000000
+    python benchmarks/bench_analytics.py --mongo --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import AnalyticsSnapshot
+from database import build_class_rankings, db_manager
+from initialize_data import SAMPLE_PROFESSORS, UNC_COURSES, parse_course_code_and_name
+from mongo_db import mongo_db
+
+def synthetic_rows(rows: int, seed: int, batch_size: int = 10000):
+    """Batches of (submissions, ratings) with unique keys, about rows of each"""
+    rng = random.Random(seed)
+    classes = [
+        (major, *parse_course_code_and_name(course))
+        for major, courses in UNC_COURSES.items() for course in courses
+    ]
+    for start in range(0, rows, batch_size):
+        submissions = []
+        ratings = []
+        for n in range(start, min(rows, start + batch_size)):
+            major, code, name = classes[n % len(classes)]
+            # n // len(classes) is distinct per class, so the unique keys never collide
+            user_id = f"user{n // len(classes)}"
+            professor = rng.choice(SAMPLE_PROFESSORS)
+            submissions.append({
+                "major": major, "class_code": code, "class_name": name, "professor": professor,
+                "difficulty_rating": rng.randint(1, 10), "user_id": user_id
+            })
+            ratings.append({
+                "major": major, "class_code": code, "professor": professor,
+                "rating": round(rng.uniform(1, 5), 1), "user_id": user_id
+            })
+        yield submissions, ratings
+
+def load_synthetic(rows: int, seed: int) -> dict:
+    snapshot = AnalyticsSnapshot()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for submissions, ratings in synthetic_rows(rows, seed):
+        snapshot.apply_submissions(submissions)
+        snapshot.apply_ratings(ratings)
+    snapshot.compact()
+    elapsed = time.perf_counter() - started
+    traced = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    stats = snapshot.stats()
+    total_rows = stats["submissions"] + stats["ratings"]
+    per_million = lambda value: round(value / total_rows * 1_000_000 / 2 ** 20, 1)
+    return snapshot, {
+        "rows": total_rows,
+        "load_rows_per_sec": round(total_rows / elapsed),
+        "mb_per_million_rows": per_million(traced),
+        "column_mb_per_million_rows": per_million(stats["column_bytes"]),
+        "key_map_mb_per_million_rows": per_million(stats["key_map_bytes"])
+    }
+
+def time_call(fn, repeat: int) -> float:
+    """Median wall time of fn in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+async def time_async(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+def snapshot_latencies(snapshot: AnalyticsSnapshot, majors, limit: int, repeat: int) -> dict:
+    return {
+        "class_rankings_ms": {
+            major: time_call(lambda: build_class_rankings(*snapshot.class_rollups(major, limit)), repeat)
+            for major in majors
+        },
+        "major_totals_ms": {major: time_call(lambda: snapshot.major_totals(major), repeat) for major in majors},
+        "majors_ms": time_call(snapshot.majors, repeat)
+    }
+
+async def compare_with_mongo(args) -> dict:
+    db_manager.connect()
+    try:
+        snapshot = AnalyticsSnapshot()
+        snapshot._submissions_collection = db_manager.class_submissions
+        snapshot._ratings_collection = db_manager.professor_ratings
+        snapshot._versions_collection = db_manager.major_versions
+        await snapshot.load()
+        majors = await db_manager._query_all_majors()
+        return {
+            "snapshot": dict(snapshot_latencies(snapshot, majors, args.limit, args.repeat), **snapshot.stats()),
+            "mongo": {
+                "class_rankings_ms": {
+                    major: await time_async(lambda: db_manager._query_class_rankings(major, args.limit), args.repeat)
+                    for major in majors
+                },
+                "major_stats_ms": {
+                    major: await time_async(lambda: db_manager._query_major_stats(major), args.repeat)
+                    for major in majors
+                },
+                "majors_ms": await time_async(db_manager._query_all_majors, args.repeat)
+            }
+        }
+    finally:
+        await mongo_db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic submissions (and as many ratings)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--mongo", action="store_true", help="Load from and compare against the seeded database")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.mongo:
+        results = asyncio.run(compare_with_mongo(args))
+        for path in ("snapshot", "mongo"):
+            rankings = results[path]["class_rankings_ms"]
+            print(f"{path:>9}: rankings median {statistics.median(rankings.values())} ms  "
+                  f"majors {results[path]['majors_ms']} ms")
+    else:
+        snapshot, memory = load_synthetic(args.rows, args.seed)
+        results = {"memory": memory, "latency": snapshot_latencies(snapshot, list(UNC_COURSES), args.limit, args.repeat)}
+        print(f"{memory['rows']:,} rows loaded at {memory['load_rows_per_sec']:,} rows/s")
+        print(f"{memory['mb_per_million_rows']} MB per million rows "
+              f"(columns {memory['column_mb_per_million_rows']} MB, key map ~{memory['key_map_mb_per_million_rows']} MB)")
+        rankings = results["latency"]["class_rankings_ms"]
+        print(f"rankings median {statistics.median(rankings.values())} ms, max {max(rankings.values())} ms; "
+              f"majors {results['latency']['majors_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
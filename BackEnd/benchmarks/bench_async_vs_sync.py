@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compare the blocking and asynchronous data paths for /majors/{major}/classes
+
+The sync path is a `def` endpoint on pymongo's blocking MongoClient, bounded by
+Starlette's threadpool; the async path is the real app on AsyncMongoClient.
+Both run the same rollup queries with the read cache disabled.
+Requires a seeded database (python initialize_data.py).
+
+    python benchmarks/bench_async_vs_sync.py --concurrency 100 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from pymongo import MongoClient
+
+from benchmarks.common import drive, serve, uvicorn_command
+from database import build_class_rankings, class_rankings_pipeline, professor_rollups_filter
+
+sync_app = FastAPI()
+_sync_db = MongoClient(
+    os.getenv("MONGODB_URL", "mongodb://localhost:27017"), maxPoolSize=50
+)[os.getenv("DATABASE_NAME", "studysync")]
+
+@sync_app.get("/")
+def sync_root():
+    return {"status": "active"}
+
+@sync_app.get("/majors/{major}/classes")
+def sync_class_rankings(major: str, limit: int = 50):
+    results = list(_sync_db.class_rollups.aggregate(class_rankings_pipeline(major, limit)))
+    professor_docs = []
+    if results:
+        professor_docs = list(_sync_db.professor_rollups.find(
+            professor_rollups_filter(major, [r["class_code"] for r in results])
+        ))
+    return build_class_rankings(results, professor_docs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--major", default="Computer Science")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    async def request(client):
+        return await client.get(f"/majors/{args.major}/classes")
+
+    env = {"QUERY_CACHE_MAX_ENTRIES": "0"}
+    results = {}
+    for name, app, port in (
+        ("sync", "benchmarks.bench_async_vs_sync:sync_app", 8101),
+        ("async", "main:app", 8102),
+    ):
+        with serve(uvicorn_command(app, port), port, env=env) as base_url:
+            results[name] = asyncio.run(drive(base_url, request, args.concurrency, args.duration))
+        print(f"{name:>6}: {results[name]['requests_per_sec']:>8} req/s  "
+              f"p50 {results[name]['p50_ms']} ms  p99 {results[name]['p99_ms']} ms  "
+              f"errors {results[name]['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
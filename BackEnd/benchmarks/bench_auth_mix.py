@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measure /majors/{major}/classes latency while logins saturate bcrypt
+
+Runs the read traffic alone, then again alongside a login burst, and reports
+both so the effect of password work on read endpoints is visible.
+Requires a seeded database (python initialize_data.py).
+
+    python benchmarks/bench_auth_mix.py --login-concurrency 32 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import NO_AUTH_RATE_LIMITS, drive, serve, uvicorn_command
+
+PASSWORD = "benchmark123"
+
+async def register_users(base_url: str, count: int, major: str):
+    """Create the login accounts, ignoring ones left over from earlier runs"""
+    grad_year = datetime.now().year + 1
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for i in range(count):
+            await client.post("/auth/register", json={
+                "email": f"bench{i}@unc.edu",
+                "password": PASSWORD,
+                "major": major,
+                "grad_year": grad_year
+            })
+
+async def run(base_url: str, args) -> dict:
+    async def read(client):
+        return await client.get(f"/majors/{args.major}/classes")
+
+    counter = iter(range(10 ** 9))
+
+    async def login(client):
+        i = next(counter) % args.users
+        return await client.post("/auth/login", json={"email": f"bench{i}@unc.edu", "password": PASSWORD})
+
+    await register_users(base_url, args.users, args.major)
+    baseline = await drive(base_url, read, args.read_concurrency, args.duration)
+    mixed_reads, mixed_logins = await asyncio.gather(
+        drive(base_url, read, args.read_concurrency, args.duration),
+        drive(base_url, login, args.login_concurrency, args.duration)
+    )
+    return {"reads_alone": baseline, "reads_with_logins": mixed_reads, "logins": mixed_logins}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--major", default="Computer Science")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--read-concurrency", type=int, default=20)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8103)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # Logins must reach bcrypt for the benchmark to measure anything
+    with serve(uvicorn_command("main:app", args.port), args.port, env=NO_AUTH_RATE_LIMITS) as base_url:
+        results = asyncio.run(run(base_url, args))
+
+    for name, result in results.items():
+        print(f"{name:>18}: {result['requests_per_sec']:>8} req/s  "
+              f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  errors {result['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
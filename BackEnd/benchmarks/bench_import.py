@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Measure the cold import cost of main.py
+
+Imports main in fresh interpreters, reports the median wall time and the
+slowest modules from `python -X importtime`. Importing main must not touch
+MongoDB, so no database is needed.
+
+    python benchmarks/bench_import.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BACKEND_DIR
+
+def import_once() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - started
+
+def slowest_modules(limit: int):
+    """Top-level modules by cumulative import time, in milliseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # importtime indents two spaces per nesting level; keep the modules
+        # imported directly by main and the other top-level imports
+        if name.startswith("   ") and not name.startswith("     "):
+            modules.append((name.strip(), int(cumulative) / 1000))
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    timings = [import_once() for _ in range(args.runs)]
+    results = {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "slowest_modules_ms": dict(slowest_modules(args.top))
+    }
+
+    print(f"import main: median {results['median_ms']} ms, min {results['min_ms']} ms over {args.runs} runs")
+    for name, ms in results["slowest_modules_ms"].items():
+        print(f"  {ms:>8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
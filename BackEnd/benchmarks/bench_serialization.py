@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare serialization cost of class rankings on the standard and fast paths
+
+standard: ClassRanking models validated through the route's response_model
+          and rendered by JSONResponse (what FastAPI does by default)
+orjson:   the trusted ranking dicts rendered straight to bytes
+msgpack:  the same dicts rendered as MessagePack
+
+No database is needed; rankings are synthetic.
+
+    python benchmarks/bench_serialization.py --sizes 50 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from auth_models import ClassRanking
+from responses import MsgPackResponse, OrjsonResponse
+from main import app
+
+def make_rankings(count: int):
+    rng = random.Random(count)
+    return [
+        {
+            "class_code": f"COMP {100 + i}",
+            "class_name": f"Synthetic Class {i}",
+            "major": "Computer Science",
+            "average_difficulty": round(rng.uniform(1, 10), 1),
+            "total_submissions": rng.randint(1, 500),
+            "professors": [
+                {"name": f"Dr. Professor {j}", "avg_rating": round(rng.uniform(1, 5), 1), "rating_count": rng.randint(0, 80)}
+                for j in range(5)
+            ]
+        }
+        for i in range(count)
+    ]
+
+def time_per_call(fn, iterations: int) -> float:
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/majors/{major}/classes")
+    loop = asyncio.new_event_loop()
+    results = {}
+
+    for size in args.sizes:
+        rankings = make_rankings(size)
+
+        def standard():
+            models = [ClassRanking(**r) for r in rankings]
+            content = loop.run_until_complete(serialize_response(field=route.response_field, response_content=models))
+            return JSONResponse(content).body
+
+        paths = {
+            "standard": standard,
+            "orjson": lambda: OrjsonResponse(rankings).body,
+            "msgpack": lambda: MsgPackResponse(rankings).body,
+        }
+        results[size] = {}
+        for name, fn in paths.items():
+            micros = time_per_call(fn, args.iterations)
+            results[size][name] = {"us_per_response": round(micros, 1), "bytes": len(fn())}
+            print(f"{size:>5} rankings  {name:>8}: {micros:>10.1f} us  {results[size][name]['bytes']:>8} bytes")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measure how read throughput scales with the number of gunicorn workers
+
+Starts the production server (gunicorn.conf.py) with 1, 2, ... N workers and
+drives /majors/{major}/classes against each, so the gain from extra cores can
+be compared with the single-process baseline.
+Requires a seeded database (python initialize_data.py).
+
+    python benchmarks/bench_workers.py --max-workers 4 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import drive, gunicorn_command, serve
+
+def worker_counts(max_workers: int) -> list:
+    """1, 2, 4, ... up to and including max_workers"""
+    counts = []
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    counts.append(max_workers)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--major", default="Computer Science")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8105)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the query cache so every request reaches MongoDB")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    async def read(client):
+        return await client.get(f"/majors/{args.major}/classes")
+
+    results = {}
+    for workers in worker_counts(args.max_workers):
+        env = {"PORT": str(args.port), "WEB_CONCURRENCY": str(workers)}
+        if args.no_cache:
+            env["QUERY_CACHE_MAX_ENTRIES"] = "0"
+        with serve(gunicorn_command(), args.port, env=env) as base_url:
+            results[workers] = asyncio.run(drive(base_url, read, args.concurrency, args.duration))
+
+    baseline = results[1]["requests_per_sec"] or 1
+    for workers, result in results.items():
+        print(f"{workers:>3} workers: {result['requests_per_sec']:>8} req/s  "
+              f"({result['requests_per_sec'] / baseline:.2f}x)  "
+              f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  errors {result['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Shared helpers for the StudySync benchmarks"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (in milliseconds) for one run"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+async def drive(
+    base_url: str,
+    make_request: Callable[[httpx.AsyncClient], Any],
+    concurrency: int,
+    duration: float,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Run concurrent clients against base_url for duration seconds"""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers=headers, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await make_request(client)
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
+
+@contextmanager
+def serve(command: List[str], port: int, env: Optional[Dict[str, str]] = None, ready_path: str = "/"):
+    """Start a server subprocess from the backend directory and wait until it answers"""
+    process_env = dict(os.environ, **(env or {}))
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=process_env)
+    try:
+        url = f"http://127.0.0.1:{port}{ready_path}"
+        for _ in range(100):
+            try:
+                httpx.get(url, timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError(f"Server on port {port} did not start")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+# Benchmark clients share one IP and log the same accounts in repeatedly, which
+# the per-IP and per-email auth rate limits would (correctly) turn away. The
+# concurrency cap stays on, since it is part of what the server does under load.
+NO_AUTH_RATE_LIMITS = {"AUTH_IP_RATE_PER_MINUTE": "0", "AUTH_EMAIL_RATE_PER_MINUTE": "0"}
+
+def uvicorn_command(app: str, port: int) -> List[str]:
+    """Command line for a single uvicorn process serving app"""
+    return [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+def gunicorn_command() -> List[str]:
+    """Command line for the production server; bind and workers come from PORT and WEB_CONCURRENCY"""
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning", "main:app"]
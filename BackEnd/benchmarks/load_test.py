@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test with a semester-rush traffic mix
+
+Seeds a dedicated database, starts the API against it and drives concurrent
+virtual users through a weighted mix of class ranking and stats reads, logins
+and bursts of difficulty submissions. Throughput and p50/p95/p99 per endpoint
+are written to a JSON file so runs can be compared across versions.
+
+    python benchmarks/load_test.py --users 200 --concurrency 100 --duration 60 --output load.json
+    python benchmarks/load_test.py --scale 50 --workers 4   # generated dataset
+    python benchmarks/load_test.py --no-seed --workers 4    # reuse the seeded database
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BACKEND_DIR, NO_AUTH_RATE_LIMITS, gunicorn_command, serve, summarize, uvicorn_command
+
+PASSWORD = "loadtest123"
+
+# Relative weight of each action a virtual user picks per iteration
+TRAFFIC_MIX = {
+    "class_rankings": 50,
+    "major_stats": 20,
+    "majors": 5,
+    "login": 10,
+    "submission_burst": 15
+}
+
+def git_revision() -> str:
+    """Commit the server under test was built from, for comparing runs"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def seed_database(env: Dict[str, str], scale: int, seed: int):
+    """Create the indexes and load data into the load-test database
+
+    scale 0 loads the small sample dataset; larger scales use the generator.
+    """
+    process_env = dict(os.environ, **env)
+    subprocess.run([sys.executable, "migrate.py"], cwd=BACKEND_DIR, env=process_env, check=True)
+    command = [sys.executable, "initialize_data.py", "--seed", str(seed)]
+    if scale:
+        command += ["--generate", "--scale", str(scale)]
+    subprocess.run(command, cwd=BACKEND_DIR, env=process_env, check=True)
+
+class LoadTest:
+    """Virtual users sharing per-endpoint latency samples"""
+
+    def __init__(self, base_url: str, args):
+        self.base_url = base_url
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.majors: List[str] = []
+        self.classes: Dict[str, List[dict]] = {}
+        self.accounts: List[dict] = []
+
+    async def timed(self, name: str, request) -> Optional[httpx.Response]:
+        """Await request, recording its latency (or an error) under name"""
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        else:
+            self.latencies[name].append(time.perf_counter() - started)
+        return response
+
+    async def setup(self, client: httpx.AsyncClient):
+        """Discover majors and classes, then register the virtual users"""
+        self.majors = (await client.get("/majors")).json()
+        if not self.majors:
+            raise RuntimeError("No majors found; seed the database first")
+        for major in self.majors:
+            self.classes[major] = (await client.get(f"/majors/{major}/classes", params={"limit": 200})).json()
+
+        grad_year = datetime.now().year + 1
+        for i in range(self.args.users):
+            major = self.majors[i % len(self.majors)]
+            email = f"load{i}@unc.edu"
+            response = await client.post("/auth/register", json={
+                "email": email, "password": PASSWORD, "major": major, "grad_year": grad_year
+            })
+            if response.status_code != 200:
+                # Left over from an earlier run against the same database
+                response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            body = response.json()
+            self.accounts.append({"email": email, "major": body["user"]["major"], "token": body["access_token"]})
+
+    async def submission_burst(self, client: httpx.AsyncClient, account: dict):
+        """Several difficulty submissions from one user at once, as after an exam"""
+        classes = self.classes.get(account["major"]) or []
+        if not classes:
+            return
+        headers = {"Authorization": f"Bearer {account['token']}"}
+        semester = f"Fall {datetime.now().year}"
+
+        def submit(ranking):
+            professors = ranking.get("professors") or [{"name": "Dr. Smith"}]
+            return self.timed("POST /submissions/difficulty", client.post("/submissions/difficulty", headers=headers, json={
+                "class_code": ranking["class_code"],
+                "class_name": ranking["class_name"],
+                "major": account["major"],
+                "difficulty_rating": self.rng.randint(1, 10),
+                "professor": self.rng.choice(professors)["name"],
+                "semester": semester
+            }))
+
+        picks = self.rng.sample(classes, min(self.args.burst_size, len(classes)))
+        await asyncio.gather(*(submit(ranking) for ranking in picks))
+
+    async def virtual_user(self, client: httpx.AsyncClient, deadline: float):
+        actions = list(TRAFFIC_MIX)
+        weights = list(TRAFFIC_MIX.values())
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights)[0]
+            major = self.rng.choice(self.majors)
+            account = self.rng.choice(self.accounts)
+            if action == "class_rankings":
+                await self.timed("GET /majors/{major}/classes", client.get(f"/majors/{major}/classes"))
+            elif action == "major_stats":
+                await self.timed("GET /majors/{major}/stats", client.get(f"/majors/{major}/stats"))
+            elif action == "majors":
+                await self.timed("GET /majors", client.get("/majors"))
+            elif action == "login":
+                await self.timed("POST /auth/login", client.post(
+                    "/auth/login", json={"email": account["email"], "password": PASSWORD}
+                ))
+            else:
+                await self.submission_burst(client, account)
+
+    async def run(self) -> dict:
+        limits = httpx.Limits(max_connections=self.args.concurrency, max_keepalive_connections=self.args.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30) as client:
+            await self.setup(client)
+            deadline = time.perf_counter() + self.args.duration
+            started = time.perf_counter()
+            await asyncio.gather(*(self.virtual_user(client, deadline) for _ in range(self.args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        endpoints = {
+            name: summarize(self.latencies[name], self.errors[name], elapsed)
+            for name in sorted(set(self.latencies) | set(self.errors))
+        }
+        everything = [latency for samples in self.latencies.values() for latency in samples]
+        return {
+            "revision": git_revision(),
+            "finished_at": datetime.utcnow().isoformat(),
+            "config": {
+                "users": self.args.users,
+                "concurrency": self.args.concurrency,
+                "duration": self.args.duration,
+                "workers": self.args.workers,
+                "burst_size": self.args.burst_size,
+                "seed": self.args.seed,
+                "scale": self.args.scale,
+                "auth_limits": self.args.auth_limits,
+                "traffic_mix": TRAFFIC_MIX
+            },
+            "total": summarize(everything, sum(self.errors.values()), elapsed),
+            "endpoints": endpoints
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="studysync_loadtest", help="Database to seed and serve (never the dev one)")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the already seeded database")
+    parser.add_argument("--scale", type=int, default=0, help="Generator scale (0 = the sample dataset)")
+    parser.add_argument("--users", type=int, default=100, help="Virtual user accounts to register")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--burst-size", type=int, default=5, help="Submissions per burst")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (gunicorn when > 1)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic mix")
+    parser.add_argument("--auth-limits", action="store_true", help="Keep the per-IP and per-email auth rate limits")
+    parser.add_argument("--port", type=int, default=8106)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    env = {"DATABASE_NAME": args.database, "PORT": str(args.port), "WEB_CONCURRENCY": str(args.workers)}
+    if not args.auth_limits:
+        env.update(NO_AUTH_RATE_LIMITS)
+    if not args.no_seed:
+        seed_database(env, args.scale, args.seed)
+
+    command = gunicorn_command() if args.workers > 1 else uvicorn_command("main:app", args.port)
+    with serve(command, args.port, env=env) as base_url:
+        results = asyncio.run(LoadTest(base_url, args).run())
+
+    for name, result in results["endpoints"].items():
+        print(f"{name:>30}: {result['requests_per_sec']:>8} req/s  p50 {result['p50_ms']} ms  "
+              f"p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  errors {result['errors']}")
+    total = results["total"]
+    print(f"{'total':>30}: {total['requests_per_sec']:>8} req/s  p99 {total['p99_ms']} ms  errors {total['errors']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
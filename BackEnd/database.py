@@ -1,63 +1,248 @@
 """Enhanced database operations for the revamped site"""
+import asyncio
+import base64
 import hashlib
-import bcrypt
+import json
+import os
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.collection import Collection
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Tuple
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.asynchronous.collection import AsyncCollection
 from mongo_db import mongo_db
+from cache import query_cache, user_cache
+from search import SearchIndex, search_index
+from distributions import DIFFICULTY_LEVELS, distributions_by_class, distributions_from_groups
+from analytics import analytics_snapshot
+from passwords import password_hasher
 from auth_models import (
     User, UserCreate, ClassDifficultySubmission, 
-    ProfessorRating, ClassRanking, MajorStats
+    ProfessorRating, MajorStats, ProfessorSummary
 )
 
+PROFESSOR_RATINGS_PAGE_SIZE = int(os.getenv("PROFESSOR_RATINGS_PAGE_SIZE", 20))
+PROFESSOR_RATINGS_MAX_PAGE_SIZE = int(os.getenv("PROFESSOR_RATINGS_MAX_PAGE_SIZE", 100))
+
+# Fields a professor ratings page may be projected to
+PROFESSOR_RATING_FIELDS = {"professor", "class_code", "rating", "review", "major", "semester", "user_id", "submitted_at"}
+
+def encode_page_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque continuation token for the (submitted_at, _id) keyset"""
+    position = {"submitted_at": doc["submitted_at"].isoformat(), "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_page_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_page_cursor; raises ValueError for malformed tokens"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position["submitted_at"]), ObjectId(position["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid page cursor")
+
+def rating_bucket(rating: float) -> str:
+    """Histogram bucket for a 1.0-5.0 rating in 0.5 steps, as a field-safe key such as 4_5"""
+    bucket = min(5.0, max(1.0, int(rating * 2) / 2))
+    return f"{bucket:.1f}".replace(".", "_")
+
+RATING_BUCKETS = [rating_bucket(1.0 + step / 2) for step in range(9)]
+
+def field_key(value: str) -> str:
+    """Make a value usable as a document field name in update paths"""
+    return value.replace(".", "_").replace("$", "_")
+
+def class_submission_key(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields identifying a user's single difficulty submission for a class"""
+    return {
+        "user_id": submission["user_id"],
+        "class_code": submission["class_code"],
+        "major": submission["major"]
+    }
+
+def professor_rating_key(rating: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields identifying a user's single rating of a professor for a class"""
+    return {
+        "user_id": rating["user_id"],
+        "professor": rating["professor"],
+        "class_code": rating["class_code"]
+    }
+
+# Order of terms within a year
+SEMESTER_TERMS = {"Spring": 1, "Summer": 2, "Fall": 3}
+
+def semester_key(semester: str) -> int:
+    """Sortable number for a semester such as "Fall 2024" (20243)"""
+    term, _, year = semester.strip().partition(" ")
+    year = year.strip()
+    if term not in SEMESTER_TERMS or not year.isdigit():
+        raise ValueError(f'Invalid semester "{semester}", expected a format like "Fall 2024"')
+    return int(year) * 10 + SEMESTER_TERMS[term]
+
+def semester_key_expression(field: str) -> Dict[str, Any]:
+    """Aggregation expression computing semester_key() from a semester field"""
+    parts = {"$split": [field, " "]}
+    year = {"$convert": {"input": {"$arrayElemAt": [parts, 1]}, "to": "int", "onError": 0, "onNull": 0}}
+    term = {"$switch": {
+        "branches": [
+            {"case": {"$eq": [{"$arrayElemAt": [parts, 0]}, name]}, "then": order}
+            for name, order in SEMESTER_TERMS.items()
+        ],
+        "default": 0
+    }}
+    return {"$add": [{"$multiply": [year, 10]}, term]}
+
+def histogram_list(histogram: Dict[str, int]) -> List[int]:
+    """Rollup histogram subdocument ({"1": n, ..., "10": n}) as a list for difficulty 1-10"""
+    return [histogram.get(str(level), 0) for level in range(1, DIFFICULTY_LEVELS + 1)]
+
+def semester_difficulty(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """SemesterDifficulty-shaped dict from a semester rollup (or a sum of them)"""
+    return {
+        "semester": doc["semester"],
+        "submission_count": doc["submission_count"],
+        "average_difficulty": round(doc["difficulty_sum"] / doc["submission_count"], 2),
+        "histogram": histogram_list(doc.get("histogram", {}))
+    }
+
+def class_rankings_pipeline(major: str, limit: int) -> List[Dict[str, Any]]:
+    """Aggregation over class_rollups returning a major's hardest classes"""
+    return [
+        {"$match": {"major": major, "submission_count": {"$gt": 0}}},
+        {
+            "$addFields": {
+                "average_difficulty": {"$divide": ["$difficulty_sum", "$submission_count"]}
+            }
+        },
+        {"$sort": {"average_difficulty": DESCENDING}},
+        {"$limit": limit}
+    ]
+
+def professor_rollups_filter(major: str, class_codes: List[str]) -> Dict[str, Any]:
+    """Query for the professor rollups of the given ranked classes"""
+    return {
+        "major": major,
+        "class_code": {"$in": class_codes},
+        "rating_count": {"$gt": 0}
+    }
+
+def build_class_rankings(results: List[Dict[str, Any]], professor_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine class rollups with their professor rollups into ClassRanking-shaped dicts
+    
+    These are trusted internal results: the API validates them once through
+    its response model, or serializes them directly on the fast path.
+    """
+    rated = {(doc["class_code"], doc["professor"]): doc for doc in professor_docs}
+    
+    rankings = []
+    for result in results:
+        professor_stats = []
+        for prof in result["professors"]:
+            doc = rated.get((result["class_code"], prof))
+            if doc:
+                professor_stats.append({
+                    "name": prof,
+                    "avg_rating": round(doc["rating_sum"] / doc["rating_count"], 1),
+                    "rating_count": doc["rating_count"]
+                })
+            else:
+                professor_stats.append({
+                    "name": prof,
+                    "avg_rating": 0.0,
+                    "rating_count": 0
+                })
+        
+        # Sort professors by rating
+        professor_stats.sort(key=lambda x: x["avg_rating"], reverse=True)
+        
+        rankings.append({
+            "class_code": result["class_code"],
+            "class_name": result["class_name"],
+            "major": result["major"],
+            "average_difficulty": round(result["average_difficulty"], 1),
+            "total_submissions": result["submission_count"],
+            "professors": professor_stats,
+            # Every ClassRanking field is present, so the fast path emits the same shape
+            "distribution": None
+        })
+    
+    return rankings
+
 class DatabaseManager:
     def __init__(self):
+        # Nothing touches MongoDB until connect(), so importing this module is
+        # cheap and safe before a server forks its workers
+        self.db = None
+    
+    def connect(self):
+        """Bind to the database, creating this process's client on first call"""
+        if self.db is not None:
+            return
+        mongo_db.connect()
         self.db = mongo_db.db
-        self.users: Collection = self.db.users
-        self.class_submissions: Collection = self.db.class_submissions
-        self.professor_ratings: Collection = self.db.professor_ratings
+        self.users: AsyncCollection = self.db.users
+        self.class_submissions: AsyncCollection = self.db.class_submissions
+        self.professor_ratings: AsyncCollection = self.db.professor_ratings
+        
+        # Rollups maintained incrementally from the raw collections above
+        self.class_rollups: AsyncCollection = self.db.class_rollups
+        self.professor_rollups: AsyncCollection = self.db.professor_rollups
+        self.professor_profiles: AsyncCollection = self.db.professor_profiles
+        self.semester_rollups: AsyncCollection = self.db.semester_rollups
         
-        # Create indexes for better performance
-        self._create_indexes()
+        # Per-major counters bumped on every write, for conditional GETs
+        self.major_versions: AsyncCollection = self.db.major_versions
     
-    def _create_indexes(self):
-        """Create database indexes for better query performance"""
+    async def create_indexes(self):
+        """Create database indexes for better query performance (run via migrate.py)"""
         # Users collection indexes
-        self.users.create_index("email", unique=True)
-        self.users.create_index("major")
-        self.users.create_index("grad_year")
+        await self.users.create_index("email", unique=True)
+        await self.users.create_index("major")
+        await self.users.create_index("grad_year")
         
         # Class submissions collection indexes
-        self.class_submissions.create_index([("major", ASCENDING), ("class_code", ASCENDING)])
-        self.class_submissions.create_index([("class_code", ASCENDING), ("major", ASCENDING)])
-        self.class_submissions.create_index("user_id")
-        self.class_submissions.create_index("professor")
+        await self.class_submissions.create_index([("major", ASCENDING), ("class_code", ASCENDING)])
+        await self.class_submissions.create_index([("class_code", ASCENDING), ("major", ASCENDING)])
+        # One submission per user per class; also serves lookups by user_id
+        await self.class_submissions.create_index(
+            [("user_id", ASCENDING), ("class_code", ASCENDING), ("major", ASCENDING)], unique=True
+        )
+        await self.class_submissions.create_index("professor")
+        # Incremental reads of recent writes (analytics snapshot refresh, exports)
+        await self.class_submissions.create_index("submitted_at")
         
         # Professor ratings collection indexes
-        self.professor_ratings.create_index([("professor", ASCENDING), ("class_code", ASCENDING)])
-        self.professor_ratings.create_index([("major", ASCENDING), ("professor", ASCENDING)])
-        self.professor_ratings.create_index("user_id")
-    
-    def _hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
-    
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        # Newest-first keyset pagination of a professor's ratings, with and without a class
+        await self.professor_ratings.create_index(
+            [("professor", ASCENDING), ("submitted_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        await self.professor_ratings.create_index(
+            [("professor", ASCENDING), ("class_code", ASCENDING), ("submitted_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        await self.professor_ratings.create_index([("major", ASCENDING), ("professor", ASCENDING)])
+        # One rating per user per professor and class; also serves lookups by user_id
+        await self.professor_ratings.create_index(
+            [("user_id", ASCENDING), ("professor", ASCENDING), ("class_code", ASCENDING)], unique=True
+        )
+        await self.professor_ratings.create_index("submitted_at")
+        
+        # Rollup collection indexes
+        await self.class_rollups.create_index([("major", ASCENDING), ("class_code", ASCENDING)], unique=True)
+        await self.professor_rollups.create_index(
+            [("professor", ASCENDING), ("class_code", ASCENDING), ("major", ASCENDING)], unique=True
+        )
+        await self.professor_rollups.create_index([("major", ASCENDING), ("class_code", ASCENDING)])
+        await self.semester_rollups.create_index(
+            [("major", ASCENDING), ("class_code", ASCENDING), ("semester", ASCENDING)], unique=True
+        )
+        # Major trends and semester-range rankings scan a major's buckets in semester order
+        await self.semester_rollups.create_index([("major", ASCENDING), ("semester_key", ASCENDING)])
     
-    def create_user(self, user_data: UserCreate) -> User:
+    async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user with hashed password"""
-        # Check if user already exists
-        existing_user = self.users.find_one({"email": user_data.email})
-        if existing_user:
-            raise ValueError("User with this email already exists")
-        
         # Hash the password
-        hashed_password = self._hash_password(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         
         # Generate display name (e.g., "Computer Science 2028")
         display_name = f"{user_data.major} {user_data.grad_year}"
@@ -73,30 +258,37 @@ class DatabaseManager:
             "email_verified": False  # For future email verification
         }
         
-        result = self.users.insert_one(user_dict)
+        # The unique email index rejects existing users in the same round trip
+        try:
+            result = await self.users.insert_one(user_dict)
+        except DuplicateKeyError:
+            raise ValueError("User with this email already exists")
         user_dict["id"] = str(result.inserted_id)
         
+        # The major's stats count its users, so their ETag must change too
+        await self._record_major_writes({user_data.major})
+        
         # Don't return password hash in user object
         user_dict.pop("password_hash", None)
         return User(**user_dict)
     
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email (without password hash)"""
-        user_doc = self.users.find_one({"email": email.lower()})
+        user_doc = await self.users.find_one({"email": email.lower()})
         if user_doc:
             user_doc["id"] = str(user_doc["_id"])
             user_doc.pop("password_hash", None)  # Don't include password hash
             return User(**user_doc)
         return None
     
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        user_doc = self.users.find_one({"email": email.lower()})
+        user_doc = await self.users.find_one({"email": email.lower()})
         if not user_doc:
             return None
         
         # Verify password
-        if not self._verify_password(password, user_doc["password_hash"]):
+        if not await password_hasher.verify(password, user_doc["password_hash"]):
             return None
         
         # Return user without password hash
@@ -104,160 +296,727 @@ class DatabaseManager:
         user_doc.pop("password_hash", None)
         return User(**user_doc)
     
-    def get_user_by_id(self, user_id: str) -> Optional[User]:
-        """Get user by ID"""
-        from bson import ObjectId
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID, served from the short-lived user cache when possible"""
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await self._query_user_by_id(user_id)
+            if user:
+                user_cache.set(user_id, user)
+        return user
+    
+    async def _query_user_by_id(self, user_id: str) -> Optional[User]:
+        """Load and validate a user document by ID"""
         try:
-            user_doc = self.users.find_one({"_id": ObjectId(user_id)})
+            user_doc = await self.users.find_one({"_id": ObjectId(user_id)})
             if user_doc:
                 user_doc["id"] = str(user_doc["_id"])
+                user_doc.pop("password_hash", None)
                 return User(**user_doc)
         except:
             pass
         return None
     
-    def submit_class_difficulty(self, submission: ClassDifficultySubmission) -> bool:
+    async def submit_class_difficulty(self, submission: ClassDifficultySubmission) -> bool:
         """Submit a class difficulty rating"""
         submission_dict = submission.dict()
         submission_dict["submitted_at"] = datetime.utcnow()
         
-        # Debug logging
-        print(f"DEBUG: Submitting difficulty for user_id: {submission.user_id}, class: {submission.class_code}, major: {submission.major}")
-        
-        # Check if user already submitted for this class
-        existing = self.class_submissions.find_one({
-            "user_id": submission.user_id,
-            "class_code": submission.class_code,
-            "major": submission.major
-        })
-        
-        if existing:
-            # Update existing submission
-            print(f"DEBUG: Updating existing submission {existing['_id']}")
-            self.class_submissions.update_one(
-                {"_id": existing["_id"]},
-                {"$set": submission_dict}
-            )
-        else:
-            # Create new submission
-            print(f"DEBUG: Creating new submission")
-            result = self.class_submissions.insert_one(submission_dict)
-            print(f"DEBUG: Inserted with ID: {result.inserted_id}")
+        existing = await self._upsert_submission(
+            self.class_submissions, class_submission_key(submission_dict), submission_dict
+        )
         
+        await self._apply_submission_rollups([(submission_dict, existing)])
         return True
     
-    def submit_professor_rating(self, rating: ProfessorRating) -> bool:
+    async def submit_professor_rating(self, rating: ProfessorRating) -> bool:
         """Submit a professor rating"""
         rating_dict = rating.dict()
         rating_dict["submitted_at"] = datetime.utcnow()
         
-        # Check if user already rated this professor for this class
-        existing = self.professor_ratings.find_one({
-            "user_id": rating.user_id,
-            "professor": rating.professor,
-            "class_code": rating.class_code
-        })
+        existing = await self._upsert_submission(
+            self.professor_ratings, professor_rating_key(rating_dict), rating_dict
+        )
+        
+        await self._apply_rating_rollups([(rating_dict, existing)])
+        return True
+    
+    async def _upsert_submission(
+        self, collection: AsyncCollection, key: Dict[str, Any], document: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Insert or replace a user's submission atomically, returning the one it replaced"""
+        for attempt in range(2):
+            try:
+                return await collection.find_one_and_update(
+                    key,
+                    {"$set": document},
+                    projection={"review": False},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError:
+                # Concurrent upserts of the same key can both attempt the insert;
+                # the loser retries once and then updates the winner's document
+                if attempt:
+                    raise ValueError("Submission conflicted with a concurrent update, please retry")
+    
+    async def submit_batch(
+        self, submissions: List[ClassDifficultySubmission], ratings: List[ProfessorRating]
+    ) -> Dict[str, List[str]]:
+        """Submit many difficulty and professor ratings with one bulk write per collection
+        
+        Returns a status per item, in input order: "created", "updated",
+        "superseded" (a later item in the batch has the same key) or "error".
+        """
+        submitted_at = datetime.utcnow()
+        submission_docs = [dict(s.dict(), submitted_at=submitted_at) for s in submissions]
+        rating_docs = [dict(r.dict(), submitted_at=submitted_at) for r in ratings]
+        
+        submission_statuses, applied_submissions = await self._bulk_upsert_submissions(
+            self.class_submissions, submission_docs, class_submission_key
+        )
+        # Fold stored submissions in before writing ratings, so a failed ratings
+        # write can't leave them in class_submissions without rollups or a version bump
+        await self._apply_submission_rollups(applied_submissions)
         
-        if existing:
-            # Update existing rating
-            self.professor_ratings.update_one(
-                {"_id": existing["_id"]},
-                {"$set": rating_dict}
+        rating_statuses, applied_ratings = await self._bulk_upsert_submissions(
+            self.professor_ratings, rating_docs, professor_rating_key
+        )
+        await self._apply_rating_rollups(applied_ratings)
+        return {"difficulty": submission_statuses, "professor": rating_statuses}
+    
+    async def _bulk_upsert_submissions(
+        self,
+        collection: AsyncCollection,
+        documents: List[Dict[str, Any]],
+        key_fn: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Tuple[List[str], List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
+        """Upsert documents with one unordered bulk_write
+        
+        Returns a status per document and the (document, replaced document)
+        pairs that were written, for the rollup updates.
+        """
+        statuses = ["superseded"] * len(documents)
+        if not documents:
+            return statuses, []
+        
+        # The last document for each key wins, as if the items were sent in order
+        keys = [key_fn(doc) for doc in documents]
+        latest = {}
+        for index, key in enumerate(keys):
+            latest[tuple(key.values())] = index
+        indexes = sorted(latest.values())
+        
+        # One read for every document the batch will replace. Unlike the single
+        # submission path this is not atomic with the write; a concurrent write
+        # to the same key can skew the rollups until rebuild_rollups() runs.
+        previous = {}
+        cursor = collection.find({"$or": [keys[i] for i in indexes]}, projection={"review": False})
+        async for doc in cursor:
+            previous[tuple(key_fn(doc).values())] = doc
+        
+        failed = set()
+        try:
+            await collection.bulk_write(
+                [UpdateOne(keys[i], {"$set": documents[i]}, upsert=True) for i in indexes],
+                ordered=False
             )
-        else:
-            # Create new rating
-            self.professor_ratings.insert_one(rating_dict)
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
         
-        return True
+        applied = []
+        for position, index in enumerate(indexes):
+            if position in failed:
+                statuses[index] = "error"
+                continue
+            replaced = previous.get(tuple(keys[index].values()))
+            statuses[index] = "updated" if replaced else "created"
+            applied.append((documents[index], replaced))
+        
+        return statuses, applied
     
-    def get_class_rankings_by_major(self, major: str, limit: int = 50) -> List[ClassRanking]:
-        """Get class rankings for a specific major, sorted by difficulty"""
-        pipeline = [
-            {"$match": {"major": major}},
+    async def _apply_submission_rollups(self, applied: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]):
+        """Fold written (submission, replaced submission) pairs into the rollups"""
+        if not applied:
+            return
+        
+        # The two rollups are independent, so their writes share one round trip of latency
+        await asyncio.gather(
+            self.class_rollups.bulk_write(
+                [update for doc, previous in applied for update in self._class_rollup_updates(doc, previous)],
+                ordered=False
+            ),
+            self.semester_rollups.bulk_write(
+                [update for doc, previous in applied for update in self._semester_rollup_updates(doc, previous)],
+                ordered=False
+            )
+        )
+        
+        if analytics_snapshot.ready:
+            analytics_snapshot.apply_submissions([doc for doc, _ in applied])
+        for doc, previous in applied:
+            search_index.add_class(doc["class_code"], doc["class_name"], doc["major"], count=0 if previous else 1)
+            search_index.add_professor(doc["professor"], doc["major"])
+        
+        await self._record_major_writes({doc["major"] for doc, _ in applied})
+    
+    async def _apply_rating_rollups(self, applied: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]):
+        """Fold written (rating, replaced rating) pairs into the rollups and professor profiles"""
+        if not applied:
+            return
+        
+        await asyncio.gather(
+            self.professor_rollups.bulk_write(
+                [update for doc, previous in applied for update in self._professor_rollup_updates(doc, previous)],
+                ordered=False
+            ),
+            self.professor_profiles.bulk_write(
+                [self._professor_profile_update(doc, previous) for doc, previous in applied],
+                ordered=False
+            )
+        )
+        
+        if analytics_snapshot.ready:
+            analytics_snapshot.apply_ratings([doc for doc, _ in applied])
+        for doc, previous in applied:
+            search_index.add_professor(doc["professor"], doc["major"], count=0 if previous else 1)
+        
+        majors = {doc["major"] for doc, _ in applied}
+        majors.update(previous["major"] for _, previous in applied if previous)
+        await self._record_major_writes(majors)
+    
+    async def _record_major_writes(self, majors: set):
+        """Bump the version counters of written majors and drop their cached reads"""
+        await self.major_versions.bulk_write(
+            [UpdateOne({"_id": major}, {"$inc": {"version": 1}}, upsert=True) for major in majors],
+            ordered=False
+        )
+        for major in majors:
+            self._invalidate_major(major)
+    
+    async def get_major_version(self, major: str, snapshot: bool = False) -> int:
+        """Current write version of a major, 0 if it has never been written
+        
+        Per-major reads are cached under the version the caller read, so a
+        worker that missed another worker's invalidation, or a load that
+        finished after one, can never answer for a newer version. Pass
+        snapshot for reads the analytics snapshot may serve: they get the
+        version the snapshot has caught up to, which its answers cover.
+        """
+        if snapshot and analytics_snapshot.ready:
+            return analytics_snapshot.versions.get(major, 0)
+        doc = await self.major_versions.find_one({"_id": major}, {"version": True})
+        return doc["version"] if doc else 0
+    
+    def _invalidate_major(self, major: str):
+        """Drop cached reads affected by a write to this major"""
+        # The majors list is cached too, since a first submission can add a major
+        query_cache.invalidate(lambda key: key[0] == "majors" or key[1] == major)
+    
+    def _class_rollup_updates(self, submission: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[UpdateOne]:
+        """Build the class rollup $inc for a submission, netting out the user's previous one"""
+        # Submissions are keyed by (user_id, class_code, major), so a replaced
+        # submission always belongs to the same rollup document
+        difficulty_delta = submission["difficulty_rating"]
+        count_delta = 1
+        if previous:
+            difficulty_delta -= previous["difficulty_rating"]
+            count_delta = 0
+        
+        # The professor set only grows; rebuild_rollups() recomputes it exactly
+        return [UpdateOne(
+            {"major": submission["major"], "class_code": submission["class_code"]},
+            {
+                "$inc": {"difficulty_sum": difficulty_delta, "submission_count": count_delta},
+                "$set": {"class_name": submission["class_name"]},
+                "$addToSet": {"professors": submission["professor"]}
+            },
+            upsert=True
+        )]
+    
+    def _semester_rollup_updates(self, submission: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[UpdateOne]:
+        """Build the semester bucket $incs for a submission, moving the user's previous one out of its bucket"""
+        updates = []
+        if previous:
+            # The replaced submission may have named another semester, so it is
+            # always removed from its own bucket rather than netted in place
+            updates.append(UpdateOne(
+                {"major": previous["major"], "class_code": previous["class_code"], "semester": previous["semester"]},
+                {"$inc": {
+                    "difficulty_sum": -previous["difficulty_rating"],
+                    "submission_count": -1,
+                    f"histogram.{previous['difficulty_rating']}": -1
+                }}
+            ))
+        
+        difficulty = submission["difficulty_rating"]
+        updates.append(UpdateOne(
+            {"major": submission["major"], "class_code": submission["class_code"], "semester": submission["semester"]},
+            {
+                "$inc": {"difficulty_sum": difficulty, "submission_count": 1, f"histogram.{difficulty}": 1},
+                "$set": {"class_name": submission["class_name"], "semester_key": semester_key(submission["semester"])},
+                "$addToSet": {"professors": submission["professor"]}
+            },
+            upsert=True
+        ))
+        return updates
+    
+    def _professor_rollup_updates(self, rating: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[UpdateOne]:
+        """Build the professor rollup $inc operations for a rating, netting out the user's previous one"""
+        key = {"professor": rating["professor"], "class_code": rating["class_code"], "major": rating["major"]}
+        rating_delta = rating["rating"]
+        count_delta = 1
+        updates = []
+        
+        if previous:
+            previous_key = {
+                "professor": previous["professor"],
+                "class_code": previous["class_code"],
+                "major": previous["major"]
+            }
+            if previous_key == key:
+                rating_delta -= previous["rating"]
+                count_delta = 0
+            else:
+                updates.append(UpdateOne(
+                    previous_key,
+                    {"$inc": {"rating_sum": -previous["rating"], "rating_count": -1}}
+                ))
+        
+        updates.append(UpdateOne(
+            key,
+            {"$inc": {"rating_sum": rating_delta, "rating_count": count_delta}},
+            upsert=True
+        ))
+        return updates
+    
+    def _professor_profile_update(self, rating: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> UpdateOne:
+        """Build the professor profile $inc for a rating, netting out the user's previous one"""
+        # Ratings are keyed by (user_id, professor, class_code), so a replaced
+        # rating always belongs to the same professor and class
+        class_field = f"classes.{field_key(rating['class_code'])}"
+        inc: Dict[str, Any] = {}
+        
+        def add(path: str, delta):
+            inc[path] = inc.get(path, 0) + delta
+        
+        for doc, sign in ((rating, 1), (previous, -1)):
+            if doc:
+                add("rating_sum", sign * doc["rating"])
+                add("rating_count", sign)
+                add(f"histogram.{rating_bucket(doc['rating'])}", sign)
+                add(f"{class_field}.rating_sum", sign * doc["rating"])
+                add(f"{class_field}.rating_count", sign)
+        
+        return UpdateOne(
+            {"_id": rating["professor"]},
+            {"$inc": inc, "$set": {f"{class_field}.class_code": rating["class_code"]}},
+            upsert=True
+        )
+    
+    async def missing_rollups(self) -> List[str]:
+        """Rollup collections that are empty although their raw collection has documents
+        
+        Reads are served only from the rollups, so these must be rebuilt
+        before the API serves an existing database that predates them.
+        """
+        sources = {
+            "class_rollups": self.class_submissions,
+            "semester_rollups": self.class_submissions,
+            "professor_rollups": self.professor_ratings,
+            "professor_profiles": self.professor_ratings
+        }
+        missing = []
+        for name, source in sources.items():
+            if await self.db[name].find_one({}, {"_id": True}) is None and \
+                    await source.find_one({}, {"_id": True}) is not None:
+                missing.append(name)
+        return missing
+    
+    async def rebuild_rollups(self) -> Dict[str, int]:
+        """Regenerate the rollup collections from the raw submissions and ratings"""
+        await self.class_submissions.aggregate([
             {
                 "$group": {
-                    "_id": {
-                        "class_code": "$class_code",
-                        "class_name": "$class_name",
-                        "major": "$major"
-                    },
-                    "average_difficulty": {"$avg": "$difficulty_rating"},
-                    "total_submissions": {"$sum": 1},
+                    "_id": {"major": "$major", "class_code": "$class_code"},
+                    "class_name": {"$last": "$class_name"},
+                    "difficulty_sum": {"$sum": "$difficulty_rating"},
+                    "submission_count": {"$sum": 1},
                     "professors": {"$addToSet": "$professor"}
                 }
             },
-            {"$sort": {"average_difficulty": DESCENDING}},
-            {"$limit": limit}
+            {
+                "$project": {
+                    "_id": 0,
+                    "major": "$_id.major",
+                    "class_code": "$_id.class_code",
+                    "class_name": 1,
+                    "difficulty_sum": 1,
+                    "submission_count": 1,
+                    "professors": 1
+                }
+            },
+            {"$out": "class_rollups"}
+        ])
+        
+        await self.professor_ratings.aggregate([
+            {
+                "$group": {
+                    "_id": {"professor": "$professor", "class_code": "$class_code", "major": "$major"},
+                    "rating_sum": {"$sum": "$rating"},
+                    "rating_count": {"$sum": 1}
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "professor": "$_id.professor",
+                    "class_code": "$_id.class_code",
+                    "major": "$_id.major",
+                    "rating_sum": 1,
+                    "rating_count": 1
+                }
+            },
+            {"$out": "professor_rollups"}
+        ])
+        
+        await self.class_submissions.aggregate([
+            {
+                "$group": {
+                    "_id": {"major": "$major", "class_code": "$class_code", "semester": "$semester"},
+                    "class_name": {"$last": "$class_name"},
+                    "difficulty_sum": {"$sum": "$difficulty_rating"},
+                    "submission_count": {"$sum": 1},
+                    "professors": {"$addToSet": "$professor"},
+                    **{
+                        f"h{level}": {"$sum": {"$cond": [{"$eq": ["$difficulty_rating", level]}, 1, 0]}}
+                        for level in range(1, DIFFICULTY_LEVELS + 1)
+                    }
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "major": "$_id.major",
+                    "class_code": "$_id.class_code",
+                    "semester": "$_id.semester",
+                    "semester_key": semester_key_expression("$_id.semester"),
+                    "class_name": 1,
+                    "difficulty_sum": 1,
+                    "submission_count": 1,
+                    "professors": 1,
+                    "histogram": {str(level): f"$h{level}" for level in range(1, DIFFICULTY_LEVELS + 1)}
+                }
+            },
+            {"$out": "semester_rollups"}
+        ])
+        
+        await self._rebuild_professor_profiles()
+        
+        # Rebuilt rollups may differ from what clients have cached
+        majors = await self.class_rollups.distinct("major")
+        if majors:
+            await self._record_major_writes(set(majors))
+        query_cache.clear()
+        return {
+            "class_rollups": await self.class_rollups.count_documents({}),
+            "professor_rollups": await self.professor_rollups.count_documents({}),
+            "professor_profiles": await self.professor_profiles.count_documents({}),
+            "semester_rollups": await self.semester_rollups.count_documents({})
+        }
+    
+    async def _rebuild_professor_profiles(self):
+        """Regenerate professor profiles with one pass over the ratings"""
+        profiles: Dict[str, Dict[str, Any]] = {}
+        cursor = self.professor_ratings.find({}, {"professor": True, "class_code": True, "rating": True})
+        async for doc in cursor:
+            profile = profiles.setdefault(doc["professor"], {
+                "_id": doc["professor"],
+                "rating_sum": 0.0,
+                "rating_count": 0,
+                "histogram": {},
+                "classes": {}
+            })
+            profile["rating_sum"] += doc["rating"]
+            profile["rating_count"] += 1
+            bucket = rating_bucket(doc["rating"])
+            profile["histogram"][bucket] = profile["histogram"].get(bucket, 0) + 1
+            class_stats = profile["classes"].setdefault(
+                field_key(doc["class_code"]),
+                {"class_code": doc["class_code"], "rating_sum": 0.0, "rating_count": 0}
+            )
+            class_stats["rating_sum"] += doc["rating"]
+            class_stats["rating_count"] += 1
+        
+        await self.professor_profiles.delete_many({})
+        if profiles:
+            await self.professor_profiles.insert_many(list(profiles.values()))
+    
+    async def load_search_index(self):
+        """Rebuild the in-memory search index from the rollups and professor profiles"""
+        index = SearchIndex(max_prefix_length=search_index.max_prefix_length)
+        async for rollup in self.class_rollups.find(
+            {"submission_count": {"$gt": 0}},
+            {"major": True, "class_code": True, "class_name": True, "submission_count": True, "professors": True}
+        ):
+            index.add_class(rollup["class_code"], rollup["class_name"], rollup["major"], rollup["submission_count"])
+            for professor in rollup.get("professors", []):
+                index.add_professor(professor, rollup["major"])
+        async for rollup in self.professor_rollups.find(
+            {"rating_count": {"$gt": 0}}, {"professor": True, "major": True, "rating_count": True}
+        ):
+            index.add_professor(rollup["professor"], rollup["major"], rollup["rating_count"])
+        # Swapped in whole, so searches never see a half-built index
+        search_index.replace(index)
+        return len(index)
+    
+    async def get_professor_summary(self, professor: str) -> Optional[ProfessorSummary]:
+        """Get a professor's precomputed averages and rating histogram"""
+        profile = await self.professor_profiles.find_one({"_id": professor})
+        if not profile or profile["rating_count"] <= 0:
+            return None
+        
+        classes = [
+            {
+                "class_code": stats["class_code"],
+                "average_rating": round(stats["rating_sum"] / stats["rating_count"], 1),
+                "rating_count": stats["rating_count"]
+            }
+            for stats in profile.get("classes", {}).values()
+            if stats.get("rating_count", 0) > 0
         ]
+        classes.sort(key=lambda x: x["rating_count"], reverse=True)
         
-        results = list(self.class_submissions.aggregate(pipeline))
-        rankings = []
-        
-        for result in results:
-            # Get professor ratings for this class
-            professor_stats = []
-            for prof in result["professors"]:
-                prof_ratings = list(self.professor_ratings.find({
-                    "professor": prof,
-                    "class_code": result["_id"]["class_code"],
-                    "major": major
-                }))
-                
-                if prof_ratings:
-                    avg_rating = sum(r["rating"] for r in prof_ratings) / len(prof_ratings)
-                    professor_stats.append({
-                        "name": prof,
-                        "avg_rating": round(avg_rating, 1),
-                        "rating_count": len(prof_ratings)
-                    })
-                else:
-                    professor_stats.append({
-                        "name": prof,
-                        "avg_rating": 0.0,
-                        "rating_count": 0
-                    })
-            
-            # Sort professors by rating
-            professor_stats.sort(key=lambda x: x["avg_rating"], reverse=True)
-            
-            ranking = ClassRanking(
-                class_code=result["_id"]["class_code"],
-                class_name=result["_id"]["class_name"],
-                major=result["_id"]["major"],
-                average_difficulty=round(result["average_difficulty"], 1),
-                total_submissions=result["total_submissions"],
-                professors=professor_stats
+        histogram = profile.get("histogram", {})
+        return ProfessorSummary(
+            professor=professor,
+            average_rating=round(profile["rating_sum"] / profile["rating_count"], 2),
+            rating_count=profile["rating_count"],
+            histogram={bucket.replace("_", "."): histogram.get(bucket, 0) for bucket in RATING_BUCKETS},
+            classes=classes
+        )
+    
+    async def get_class_rankings_by_major(
+        self,
+        major: str,
+        limit: int = 50,
+        include_distribution: bool = False,
+        version: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get class rankings for a specific major, sorted by difficulty
+        
+        With include_distribution, each ranking also carries its class's
+        difficulty histogram and percentiles. version is the major's write
+        version the caller built its ETag from (see get_major_version).
+        """
+        if analytics_snapshot.ready:
+            rankings = build_class_rankings(*analytics_snapshot.class_rollups(major, limit))
+        else:
+            rankings = await query_cache.get_or_load_async(
+                ("class_rankings", major, limit, version),
+                lambda: self._query_class_rankings(major, limit)
             )
-            rankings.append(ranking)
+        if not include_distribution:
+            return rankings
+        
+        distributions = await self.get_difficulty_distributions(major, version=version)
+        # Copies, so the cached rankings stay distribution-free
+        return [{**ranking, "distribution": distributions.get(ranking["class_code"])} for ranking in rankings]
+    
+    async def get_difficulty_distributions(self, major: str, version: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Difficulty histogram, median, quartiles and spread of every class in a major"""
+        if analytics_snapshot.ready:
+            return distributions_by_class(*analytics_snapshot.difficulty_histograms(major))
+        return await query_cache.get_or_load_async(
+            ("difficulty_distributions", major, version),
+            lambda: self._query_difficulty_distributions(major)
+        )
+    
+    async def _query_difficulty_distributions(self, major: str) -> Dict[str, Dict[str, Any]]:
+        """Count ratings per (class, difficulty) in MongoDB, then summarize every class at once in NumPy"""
+        cursor = await self.class_submissions.aggregate([
+            {"$match": {"major": major}},
+            {"$group": {
+                "_id": {"class_code": "$class_code", "difficulty": "$difficulty_rating"},
+                "count": {"$sum": 1}
+            }}
+        ])
+        return distributions_from_groups(await cursor.to_list())
+    
+    async def _query_class_rankings(self, major: str, limit: int) -> List[Dict[str, Any]]:
+        """Build class rankings for a major from the rollups"""
+        cursor = await self.class_rollups.aggregate(class_rankings_pipeline(major, limit))
+        results = await cursor.to_list()
+        
+        # One batched read for the professor averages of every ranked class
+        professor_docs = []
+        if results:
+            professor_docs = await self.professor_rollups.find(
+                professor_rollups_filter(major, [r["class_code"] for r in results])
+            ).to_list()
+        
+        return build_class_rankings(results, professor_docs)
+    
+    async def get_class_rankings_for_semesters(
+        self,
+        major: str,
+        limit: int,
+        from_key: int,
+        to_key: int,
+        include_distribution: bool = False,
+        version: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Class rankings counting only submissions from semesters in [from_key, to_key]"""
+        results = await query_cache.get_or_load_async(
+            ("class_rankings_semesters", major, limit, from_key, to_key, version),
+            lambda: self._query_class_rankings_for_semesters(major, limit, from_key, to_key)
+        )
+        rankings, histograms = results
+        if not include_distribution:
+            return rankings
+        
+        # Summed semester histograms give the distribution of just the selected range
+        matrix = np.array(list(histograms.values()), dtype=np.int64).reshape(-1, DIFFICULTY_LEVELS)
+        distributions = distributions_by_class(list(histograms), matrix)
+        return [{**ranking, "distribution": distributions.get(ranking["class_code"])} for ranking in rankings]
+    
+    async def _query_class_rankings_for_semesters(
+        self,
+        major: str,
+        limit: int,
+        from_key: int,
+        to_key: int
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, List[int]]]:
+        """Sum a major's semester buckets in range per class, then rank like the all-time rollups"""
+        levels = range(1, DIFFICULTY_LEVELS + 1)
+        cursor = await self.semester_rollups.aggregate([
+            {"$match": {
+                "major": major,
+                "semester_key": {"$gte": from_key, "$lte": to_key},
+                "submission_count": {"$gt": 0}
+            }},
+            {"$group": {
+                "_id": "$class_code",
+                "class_name": {"$last": "$class_name"},
+                "difficulty_sum": {"$sum": "$difficulty_sum"},
+                "submission_count": {"$sum": "$submission_count"},
+                "professors": {"$push": "$professors"},
+                **{f"h{level}": {"$sum": f"$histogram.{level}"} for level in levels}
+            }},
+            {"$addFields": {
+                "class_code": "$_id",
+                "major": {"$literal": major},
+                "average_difficulty": {"$divide": ["$difficulty_sum", "$submission_count"]},
+                "professors": {"$reduce": {
+                    "input": "$professors", "initialValue": [], "in": {"$setUnion": ["$$value", "$$this"]}
+                }}
+            }},
+            {"$sort": {"average_difficulty": DESCENDING}},
+            {"$limit": limit}
+        ])
+        results = await cursor.to_list()
+        
+        professor_docs = []
+        if results:
+            professor_docs = await self.professor_rollups.find(
+                professor_rollups_filter(major, [r["class_code"] for r in results])
+            ).to_list()
         
-        return rankings
+        histograms = {r["class_code"]: [r[f"h{level}"] for level in levels] for r in results}
+        return build_class_rankings(results, professor_docs), histograms
     
-    def get_all_majors(self) -> List[str]:
+    async def get_class_trend(self, major: str, class_code: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """A class's difficulty per semester, oldest first, or None if it has no submissions"""
+        return await query_cache.get_or_load_async(
+            ("class_trend", major, class_code, version),
+            lambda: self._query_class_trend(major, class_code)
+        )
+    
+    async def _query_class_trend(self, major: str, class_code: str) -> Optional[Dict[str, Any]]:
+        buckets = await self.semester_rollups.find(
+            {"major": major, "class_code": class_code, "submission_count": {"$gt": 0}}
+        ).sort("semester_key", ASCENDING).to_list()
+        if not buckets:
+            return None
+        return {
+            "major": major,
+            "class_code": class_code,
+            "class_name": buckets[-1]["class_name"],
+            "semesters": [semester_difficulty(bucket) for bucket in buckets]
+        }
+    
+    async def get_major_trend(self, major: str, version: Optional[int] = None) -> Dict[str, Any]:
+        """Difficulty across all of a major's classes per semester, oldest first"""
+        return await query_cache.get_or_load_async(
+            ("major_trend", major, version), lambda: self._query_major_trend(major)
+        )
+    
+    async def _query_major_trend(self, major: str) -> Dict[str, Any]:
+        levels = range(1, DIFFICULTY_LEVELS + 1)
+        cursor = await self.semester_rollups.aggregate([
+            {"$match": {"major": major, "submission_count": {"$gt": 0}}},
+            {"$group": {
+                "_id": {"semester_key": "$semester_key", "semester": "$semester"},
+                "difficulty_sum": {"$sum": "$difficulty_sum"},
+                "submission_count": {"$sum": "$submission_count"},
+                **{f"h{level}": {"$sum": f"$histogram.{level}"} for level in levels}
+            }},
+            {"$sort": {"_id.semester_key": ASCENDING}}
+        ])
+        semesters = []
+        for doc in await cursor.to_list():
+            doc["semester"] = doc["_id"]["semester"]
+            doc["histogram"] = {str(level): doc[f"h{level}"] for level in levels}
+            semesters.append(semester_difficulty(doc))
+        return {"major": major, "class_code": None, "class_name": None, "semesters": semesters}
+    
+    async def get_all_majors(self) -> List[str]:
         """Get all unique majors that have submissions"""
-        majors = self.class_submissions.distinct("major")
+        if analytics_snapshot.ready:
+            return analytics_snapshot.majors()
+        return await query_cache.get_or_load_async(("majors",), self._query_all_majors)
+    
+    async def _query_all_majors(self) -> List[str]:
+        """Read the distinct majors from the class rollups"""
+        majors = await self.class_rollups.distinct("major", {"submission_count": {"$gt": 0}})
         return sorted(majors)
     
-    def get_major_stats(self, major: str) -> MajorStats:
+    async def get_major_stats(self, major: str, version: Optional[int] = None) -> MajorStats:
         """Get statistics for a specific major"""
-        # Count unique classes
-        unique_classes = len(self.class_submissions.distinct("class_code", {"major": major}))
-        
+        return await query_cache.get_or_load_async(
+            ("major_stats", major, version), lambda: self._query_major_stats(major)
+        )
+    
+    async def _query_major_stats(self, major: str) -> MajorStats:
+        """Compute major statistics from the class rollups"""
         # Count users in this major
-        user_count = self.users.count_documents({"major": major})
+        user_count = await self.users.count_documents({"major": major})
+        
+        if analytics_snapshot.ready:
+            unique_classes, avg_difficulty = analytics_snapshot.major_totals(major)
+            return MajorStats(
+                major=major,
+                total_classes=unique_classes,
+                total_users=user_count,
+                average_difficulty=round(avg_difficulty, 1)
+            )
         
-        # Get average difficulty across all classes
+        # Class count and overall average difficulty from the class rollups
         pipeline = [
-            {"$match": {"major": major}},
+            {"$match": {"major": major, "submission_count": {"$gt": 0}}},
             {
                 "$group": {
                     "_id": None,
-                    "avg_difficulty": {"$avg": "$difficulty_rating"}
+                    "total_classes": {"$sum": 1},
+                    "difficulty_sum": {"$sum": "$difficulty_sum"},
+                    "submission_count": {"$sum": "$submission_count"}
                 }
             }
         ]
         
-        avg_result = list(self.class_submissions.aggregate(pipeline))
-        avg_difficulty = avg_result[0]["avg_difficulty"] if avg_result else 0.0
+        totals = await (await self.class_rollups.aggregate(pipeline)).to_list()
+        unique_classes = totals[0]["total_classes"] if totals else 0
+        avg_difficulty = totals[0]["difficulty_sum"] / totals[0]["submission_count"] if totals else 0.0
         
         return MajorStats(
             major=major,
@@ -266,26 +1025,89 @@ class DatabaseManager:
             average_difficulty=round(avg_difficulty, 1)
         )
     
-    def get_professor_ratings(self, professor: str, class_code: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get ratings for a specific professor, optionally filtered by class"""
-        query = {"professor": professor}
+    async def get_professor_ratings(
+        self,
+        professor: str,
+        class_code: Optional[str] = None,
+        limit: int = PROFESSOR_RATINGS_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one newest-first page of ratings for a professor, optionally filtered by class
+        
+        Returns the page and the cursor for the next one (None on the last page).
+        fields restricts the returned fields, e.g. ["rating"] to skip review text.
+        """
+        query: Dict[str, Any] = {"professor": professor}
         if class_code:
             query["class_code"] = class_code
+        if cursor:
+            submitted_at, last_id = decode_page_cursor(cursor)
+            query["$or"] = [
+                {"submitted_at": {"$lt": submitted_at}},
+                {"submitted_at": submitted_at, "_id": {"$lt": last_id}}
+            ]
+        
+        projection = None
+        if fields:
+            unknown = set(fields) - PROFESSOR_RATING_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            # submitted_at is always returned since the cursor is built from it
+            projection = {field: True for field in fields}
+            projection["submitted_at"] = True
+        
+        limit = max(1, min(limit, PROFESSOR_RATINGS_MAX_PAGE_SIZE))
+        ratings = await self.professor_ratings.find(query, projection).sort(
+            [("submitted_at", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1).to_list()
+        
+        next_cursor = None
+        if len(ratings) > limit:
+            ratings = ratings[:limit]
+            next_cursor = encode_page_cursor(ratings[-1])
         
-        ratings = list(self.professor_ratings.find(query))
         for rating in ratings:
             rating["id"] = str(rating.pop("_id"))
         
-        return ratings
+        return ratings, next_cursor
+    
+    async def export_documents(
+        self,
+        collection_name: str,
+        major: Optional[str] = None,
+        semester: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream raw submissions or ratings straight from a cursor, batch_size at a time"""
+        if collection_name not in ("class_submissions", "professor_ratings"):
+            raise ValueError(f"Unknown export collection: {collection_name}")
+        
+        query: Dict[str, Any] = {}
+        if major:
+            query["major"] = major
+        if semester:
+            query["semester"] = semester
+        if since or until:
+            query["submitted_at"] = {}
+            if since:
+                query["submitted_at"]["$gte"] = since
+            if until:
+                query["submitted_at"]["$lt"] = until
+        
+        async for doc in self.db[collection_name].find(query, batch_size=batch_size):
+            yield doc
     
-    def get_database_health(self):
+    async def get_database_health(self):
         """Check database health for monitoring"""
         try:
             # Test database connection
-            self.db.command('ping')
+            await self.db.command('ping')
             
             # Get database stats
-            stats = self.db.command("dbStats")
+            stats = await self.db.command("dbStats")
             
             return {
                 "status": "healthy",
@@ -298,7 +1120,7 @@ class DatabaseManager:
             return {
                 "status": "unhealthy",
                 "error": str(e),
-                "database": self.db.name if self.db else "unknown"
+                "database": self.db.name if self.db is not None else "unknown"
             }
 
 # Global database manager instance
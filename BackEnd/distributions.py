@@ -0,0 +1,73 @@
+"""Vectorized difficulty distributions (1-10 histograms and percentiles) per class"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+DIFFICULTY_LEVELS = 10
+_LEVELS = np.arange(1, DIFFICULTY_LEVELS + 1, dtype=np.float64)
+
+def histogram_matrix(class_index: np.ndarray, difficulty: np.ndarray, counts: np.ndarray, n_classes: int) -> np.ndarray:
+    """(n_classes, 10) matrix of rating counts from parallel class/difficulty/count arrays"""
+    levels = np.clip(difficulty.astype(np.int64), 1, DIFFICULTY_LEVELS) - 1
+    flat = np.bincount(class_index * DIFFICULTY_LEVELS + levels, weights=counts, minlength=n_classes * DIFFICULTY_LEVELS)
+    return flat.reshape(n_classes, DIFFICULTY_LEVELS).astype(np.int64)
+
+def _quantile(cumulative: np.ndarray, totals: np.ndarray, q: float) -> np.ndarray:
+    """Linearly interpolated quantile of each row's ratings, read off its cumulative histogram
+
+    Matches np.percentile over the expanded ratings without materializing them.
+    """
+    position = q * (totals - 1)
+    lower = np.floor(position)
+    upper = np.ceil(position)
+    # The value at sorted position p is the first level whose cumulative count exceeds p
+    lower_value = (cumulative <= lower[:, None]).sum(axis=1) + 1
+    upper_value = (cumulative <= upper[:, None]).sum(axis=1) + 1
+    return lower_value + (upper_value - lower_value) * (position - lower)
+
+def summarize_histograms(histograms: np.ndarray) -> Dict[str, np.ndarray]:
+    """Median, quartiles, standard deviation and share of 9-10 ratings for each histogram row"""
+    totals = histograms.sum(axis=1)
+    safe_totals = np.maximum(totals, 1)
+    cumulative = histograms.cumsum(axis=1)
+
+    mean = histograms @ _LEVELS / safe_totals
+    variance = histograms @ (_LEVELS ** 2) / safe_totals - mean ** 2
+    return {
+        "count": totals,
+        "median": _quantile(cumulative, safe_totals, 0.5),
+        "p25": _quantile(cumulative, safe_totals, 0.25),
+        "p75": _quantile(cumulative, safe_totals, 0.75),
+        "std_dev": np.sqrt(np.maximum(variance, 0)),
+        "hard_share": histograms[:, 8:].sum(axis=1) / safe_totals
+    }
+
+def distributions_from_groups(groups: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-class distributions from {_id: {class_code, difficulty}, count} group results"""
+    if not groups:
+        return {}
+
+    codes = np.array([group["_id"]["class_code"] for group in groups], dtype=object)
+    difficulty = np.fromiter((group["_id"]["difficulty"] for group in groups), dtype=np.float64, count=len(groups))
+    counts = np.fromiter((group["count"] for group in groups), dtype=np.float64, count=len(groups))
+
+    class_codes, class_index = np.unique(codes, return_inverse=True)
+    histograms = histogram_matrix(class_index, difficulty, counts, len(class_codes))
+    return distributions_by_class(class_codes, histograms)
+
+def distributions_by_class(class_codes, histograms: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    """Plain (JSON-ready) DifficultyDistribution dicts keyed by class code"""
+    summary = {name: values.tolist() for name, values in summarize_histograms(histograms).items()}
+    rows = histograms.tolist()
+    return {
+        code: {
+            "histogram": rows[i],
+            "median": round(summary["median"][i], 2),
+            "p25": round(summary["p25"][i], 2),
+            "p75": round(summary["p75"][i], 2),
+            "std_dev": round(summary["std_dev"][i], 2),
+            "hard_share": round(summary["hard_share"][i], 3)
+        }
+        for i, code in enumerate(class_codes)
+        if summary["count"][i] > 0
+    }
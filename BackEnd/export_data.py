@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+StudySync Data Export Script
+Streams class submissions and professor ratings as NDJSON for analysis
+
+    python export_data.py professor_ratings --major "Computer Science" > ratings.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+from mongo_db import mongo_db
+from database import db_manager
+
+EXPORT_COLLECTIONS = ("class_submissions", "professor_ratings")
+
+def _json_default(value):
+    """Encode the BSON types found in submissions"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+async def ndjson_lines(
+    collection: str,
+    major: Optional[str] = None,
+    semester: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> AsyncIterator[bytes]:
+    """Yield one encoded JSON line per document, never holding more than a cursor batch"""
+    async for doc in db_manager.export_documents(collection, major, semester, since, until):
+        yield (json.dumps(doc, default=_json_default) + "\n").encode("utf-8")
+
+async def export_data(args):
+    """Write the requested collections as NDJSON to the output file or stdout"""
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    collections = [args.collection] if args.collection != "all" else list(EXPORT_COLLECTIONS)
+    
+    db_manager.connect()
+    try:
+        for collection in collections:
+            count = 0
+            async for line in ndjson_lines(collection, args.major, args.semester, args.since, args.until):
+                output.write(line)
+                count += 1
+            print(f"✅ Exported {count} documents from {collection}", file=sys.stderr)
+    except Exception as e:
+        print(f"❌ Error during export: {e}", file=sys.stderr)
+        raise
+    finally:
+        if args.output:
+            output.close()
+        await mongo_db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export StudySync submissions as NDJSON")
+    parser.add_argument("collection", choices=EXPORT_COLLECTIONS + ("all",))
+    parser.add_argument("--major", help="Only export this major")
+    parser.add_argument("--semester", help='Only export this semester, e.g. "Fall 2024"')
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Submitted at or after (ISO date)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Submitted before (ISO date)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    asyncio.run(export_data(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Gunicorn settings for the production server: one uvicorn worker per core"""
+import os
+
+def _available_cores() -> int:
+    """CPU cores this process may run on (respects container CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Async workers don't block on I/O, so one per core is enough. Each worker
+# opens its own MongoDB pool (MONGO_MAX_POOL_SIZE) and bcrypt pool
+# (PASSWORD_POOL_WORKERS) in its lifespan, after the fork. Containers often
+# see the host's cores rather than their CPU quota, so the default is capped;
+# set WEB_CONCURRENCY to go higher.
+DEFAULT_MAX_WORKERS = 4
+workers = int(os.getenv("WEB_CONCURRENCY", min(_available_cores(), DEFAULT_MAX_WORKERS)))
+
+# Leave time for the write-behind queue to drain on shutdown
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+keepalive = 5
+
+# Proxies allowed to rewrite the client address from X-Forwarded-For. Never
+# use "*": uvicorn then takes the leftmost entry, which the client writes. The
+# per-IP auth rate limits read the header themselves (TRUSTED_PROXY_HOPS).
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,180 @@
+"""Write-behind ingestion queue that coalesces submissions into bulk flushes"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from auth_models import ClassDifficultySubmission, ProfessorRating
+from database import db_manager
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+
+class IngestQueueFull(Exception):
+    """Raised when the write-behind queue has reached its maximum depth"""
+
+class WriteBehindQueue:
+    """Acknowledges validated submissions once queued and writes them in batches
+
+    Pending items are keyed like the unique submission indexes, so a user
+    re-submitting the same class before a flush replaces their earlier item.
+    A flush runs when flush_size items are pending or every flush_interval
+    seconds, and stop() drains whatever is left, retrying failed flushes for
+    up to drain_timeout seconds.
+    """
+
+    def __init__(self, flush_size: int = 200, flush_interval: float = 0.5, max_depth: int = 10000,
+                 drain_timeout: float = 20.0):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_depth = max_depth
+        self.drain_timeout = drain_timeout
+        self._submissions: Dict[Tuple, ClassDifficultySubmission] = {}
+        self._ratings: Dict[Tuple, ProfessorRating] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.item_errors = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._submissions) + len(self._ratings)
+
+    async def start(self):
+        """Start the background flush task on the running event loop"""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and drain every pending item, giving up after drain_timeout"""
+        self._stopping = True
+        if self._task:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        deadline = time.monotonic() + self.drain_timeout
+        backoff = 0.1
+        while self.depth:
+            if await self.flush():
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, 2.0)
+
+        if self.depth:
+            self.dropped += self.depth
+            print(f"❌ Write-behind drain gave up after {self.drain_timeout}s, dropping {self.depth} items")
+            self._submissions = {}
+            self._ratings = {}
+
+    def enqueue_submission(self, submission: ClassDifficultySubmission):
+        """Queue a validated class difficulty submission"""
+        key = (submission.user_id, submission.class_code, submission.major)
+        self._enqueue(self._submissions, key, submission)
+
+    def enqueue_rating(self, rating: ProfessorRating):
+        """Queue a validated professor rating"""
+        key = (rating.user_id, rating.professor, rating.class_code)
+        self._enqueue(self._ratings, key, rating)
+
+    def _enqueue(self, pending: Dict[Tuple, Any], key: Tuple, item: Any):
+        if key in pending:
+            # Keep only the latest item per key, in arrival order
+            del pending[key]
+            self.coalesced += 1
+        elif self.depth >= self.max_depth:
+            raise IngestQueueFull("Submission queue is full")
+
+        pending[key] = item
+        self.enqueued += 1
+        if self.depth >= self.flush_size and self._wakeup:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # flush() requeues on write errors; anything else must not stop the loop
+                self.flush_errors += 1
+                print(f"❌ Write-behind flush crashed: {e}")
+
+    async def flush(self) -> bool:
+        """Write every pending item with one bulk write per collection"""
+        if not self.depth:
+            return True
+
+        submissions, self._submissions = self._submissions, {}
+        ratings, self._ratings = self._ratings, {}
+        started = time.perf_counter()
+        try:
+            statuses = await db_manager.submit_batch(list(submissions.values()), list(ratings.values()))
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"❌ Write-behind flush failed, requeueing {len(submissions) + len(ratings)} items: {e}")
+            # Put the batch back behind anything newer that arrived meanwhile
+            self._submissions = {**submissions, **self._submissions}
+            self._ratings = {**ratings, **self._ratings}
+            return False
+
+        # Items the bulk write rejected were already acknowledged with a 202, so
+        # they can't be reported to the client; count and log them instead
+        failed = [
+            key
+            for pending, kind in ((submissions, "difficulty"), (ratings, "professor"))
+            for key, status in zip(pending, statuses[kind])
+            if status == "error"
+        ]
+        if failed:
+            self.item_errors += len(failed)
+            print(f"❌ Write-behind flush lost {len(failed)} items the bulk write rejected: {failed[:10]}")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.flushed += len(submissions) + len(ratings) - len(failed)
+        self.last_flush_ms = round(elapsed_ms, 2)
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, coalescing and flush latency counters"""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "flush_size": self.flush_size,
+            "flush_interval_seconds": self.flush_interval,
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "item_errors": self.item_errors,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms
+        }
+
+# Global write-behind queue, used only when WRITE_BEHIND_ENABLED is set
+ingest_queue = WriteBehindQueue(
+    flush_size=int(os.getenv("WRITE_BEHIND_FLUSH_SIZE", 200)),
+    flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_SECONDS", 0.5)),
+    max_depth=int(os.getenv("WRITE_BEHIND_MAX_DEPTH", 10000)),
+    # Kept under gunicorn's GRACEFUL_TIMEOUT so the drain finishes before the worker is killed
+    drain_timeout=float(os.getenv("WRITE_BEHIND_DRAIN_SECONDS", 20))
+)
@@ -4,8 +4,15 @@ StudySync Database Initialization Script
 Populates the database with UNC course data for testing and demonstration
 """
 
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
 import random
+import time
 from datetime import datetime, timedelta
+from pymongo import MongoClient
 from mongo_db import mongo_db
 from database import db_manager
 from auth_models import ClassDifficultySubmission, ProfessorRating
@@ -338,6 +345,18 @@ UNC_COURSES = {
     ]
 }
 
+# Review text for generated professor ratings
+REVIEW_TEMPLATES = [
+    "Great professor! {professor} really knows the material and explains it well.",
+    "Challenging class but {professor} is very helpful during office hours.",
+    "I learned a lot in this class. {professor} is passionate about the subject.",
+    "Fair grader and clear expectations. Would recommend {professor}.",
+    "Tough but fair. {professor} really pushes students to excel.",
+    "Engaging lectures and interesting assignments from {professor}.",
+    "Very knowledgeable professor. {professor} made the material accessible.",
+    ""  # Some ratings have no review
+]
+
 def parse_course_code_and_name(course_string):
     """Parse a course string like 'COMP 550 – Algorithms and Analysis' into code and name"""
     if " – " in course_string:
@@ -350,9 +369,14 @@ def parse_course_code_and_name(course_string):
         # If no separator, treat the whole thing as the code
         return course_string.strip(), course_string.strip()
 
-def generate_sample_user_id():
-    """Generate a fake user ID for sample data"""
-    return hashlib.md5(f"sample_user_{random.randint(1, 1000)}".encode()).hexdigest()[:24]
+def sample_user_id(n):
+    """Fake user ID for the nth sample user"""
+    return hashlib.md5(f"sample_user_{n}".encode()).hexdigest()[:24]
+
+def generate_sample_user_ids(count):
+    """Generate distinct fake user IDs for sample data"""
+    # Distinct per class, since each user may only rate a class once
+    return [sample_user_id(n) for n in random.sample(range(1, 1001), count)]
 
 def create_sample_class_submissions(major, courses, num_submissions_per_class=3):
     """Create sample class difficulty submissions"""
@@ -362,7 +386,7 @@ def create_sample_class_submissions(major, courses, num_submissions_per_class=3)
         code, name = parse_course_code_and_name(course_string)
         
         # Create multiple submissions per class to simulate real usage
-        for _ in range(random.randint(1, num_submissions_per_class)):
+        for user_id in generate_sample_user_ids(random.randint(1, num_submissions_per_class)):
             professor = random.choice(SAMPLE_PROFESSORS)
             difficulty = random.randint(3, 9)  # Most classes fall between 3-9 difficulty
             
@@ -383,7 +407,7 @@ def create_sample_class_submissions(major, courses, num_submissions_per_class=3)
                 "difficulty_rating": difficulty,
                 "professor": professor,
                 "semester": semester,
-                "user_id": generate_sample_user_id(),
+                "user_id": user_id,
                 "submitted_at": datetime.utcnow() - timedelta(days=random.randint(1, 365))
             }
             submissions.append(submission)
@@ -401,24 +425,13 @@ def create_sample_professor_ratings(major, courses, num_ratings_per_class=2):
         professors_for_class = random.sample(SAMPLE_PROFESSORS, min(3, len(SAMPLE_PROFESSORS)))
         
         for professor in professors_for_class:
-            for _ in range(random.randint(1, num_ratings_per_class)):
+            for user_id in generate_sample_user_ids(random.randint(1, num_ratings_per_class)):
                 # Professor ratings tend to be normally distributed around 3.5
                 rating = round(random.gauss(3.5, 0.8), 1)
                 rating = max(1.0, min(5.0, rating))  # Clamp between 1.0 and 5.0
                 
                 # Generate realistic reviews
-                review_templates = [
-                    f"Great professor! {professor} really knows the material and explains it well.",
-                    f"Challenging class but {professor} is very helpful during office hours.",
-                    f"I learned a lot in this class. {professor} is passionate about the subject.",
-                    f"Fair grader and clear expectations. Would recommend {professor}.",
-                    f"Tough but fair. {professor} really pushes students to excel.",
-                    f"Engaging lectures and interesting assignments from {professor}.",
-                    f"Very knowledgeable professor. {professor} made the material accessible.",
-                    ""  # Some ratings have no review
-                ]
-                
-                review = random.choice(review_templates)
+                review = random.choice(REVIEW_TEMPLATES).format(professor=professor)
                 
                 current_year = datetime.now().year
                 semester_options = [
@@ -435,22 +448,23 @@ def create_sample_professor_ratings(major, courses, num_ratings_per_class=2):
                     "review": review,
                     "major": major,
                     "semester": semester,
-                    "user_id": generate_sample_user_id(),
+                    "user_id": user_id,
                     "submitted_at": datetime.utcnow() - timedelta(days=random.randint(1, 365))
                 }
                 ratings.append(rating_obj)
     
     return ratings
 
-def initialize_database():
+async def initialize_database():
     """Initialize the database with sample UNC course data"""
     print("🚀 Starting StudySync database initialization...")
     
+    db_manager.connect()
     try:
         # Clear existing data
         print("🧹 Clearing existing data...")
-        db_manager.class_submissions.delete_many({})
-        db_manager.professor_ratings.delete_many({})
+        await db_manager.class_submissions.delete_many({})
+        await db_manager.professor_ratings.delete_many({})
         
         total_submissions = 0
         total_ratings = 0
@@ -462,17 +476,21 @@ def initialize_database():
             # Create class difficulty submissions
             submissions = create_sample_class_submissions(major, courses)
             if submissions:
-                db_manager.class_submissions.insert_many(submissions)
+                await db_manager.class_submissions.insert_many(submissions)
                 total_submissions += len(submissions)
                 print(f"   ✅ Added {len(submissions)} class difficulty submissions")
             
             # Create professor ratings
             ratings = create_sample_professor_ratings(major, courses)
             if ratings:
-                db_manager.professor_ratings.insert_many(ratings)
+                await db_manager.professor_ratings.insert_many(ratings)
                 total_ratings += len(ratings)
                 print(f"   ✅ Added {len(ratings)} professor ratings")
         
+        # Raw inserts bypass the submission path, so regenerate the rollups
+        print("\n🔄 Rebuilding rollups...")
+        await db_manager.rebuild_rollups()
+        
         print(f"\n🎉 Database initialization complete!")
         print(f"📊 Summary:")
         print(f"   - {len(UNC_COURSES)} majors")
@@ -484,7 +502,7 @@ def initialize_database():
         # Test the data
         print(f"\n🔍 Testing database queries...")
         for major in list(UNC_COURSES.keys())[:3]:  # Test first 3 majors
-            rankings = db_manager.get_class_rankings_by_major(major, limit=5)
+            rankings = await db_manager.get_class_rankings_by_major(major, limit=5)
             print(f"   - {major}: {len(rankings)} ranked classes")
         
         print(f"\n✅ StudySync is ready with realistic UNC course data!")
@@ -493,6 +511,197 @@ def initialize_database():
     except Exception as e:
         print(f"❌ Error during initialization: {e}")
         raise
+    finally:
+        await mongo_db.close()
+
+# --- Generator mode: large reproducible datasets built in parallel ---
+
+# Per unit of --scale
+USERS_PER_SCALE = 1000
+SUBMISSIONS_PER_CLASS_PER_SCALE = 20
+RATINGS_PER_PROFESSOR_PER_SCALE = 5
+PROFESSORS_PER_CLASS = 3
+
+_worker_db = None
+
+def _init_generator_worker():
+    """Open a blocking client in each generator process"""
+    global _worker_db
+    _worker_db = MongoClient(
+        os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    )[os.getenv("DATABASE_NAME", "studysync")]
+
+def _insert_in_batches(collection_name, documents, batch_size):
+    """Stream documents into collection_name with unordered fixed-size inserts"""
+    collection = _worker_db[collection_name]
+    batch = []
+    inserted = 0
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+def _semesters(year):
+    return [f"Fall {year - 1}", f"Spring {year}", f"Fall {year}", f"Spring {year + 1}"]
+
+def generate_class_submissions(task):
+    """Insert one class's submissions; each comes from a distinct user"""
+    seed, major, code, name, users, count, batch_size, anchor = task
+    rng = random.Random(f"{seed}:submissions:{major}:{code}")
+    semesters = _semesters(anchor.year)
+
+    def documents():
+        for n in rng.sample(range(1, users + 1), count):
+            yield {
+                "class_code": code,
+                "class_name": name,
+                "major": major,
+                "difficulty_rating": max(1, min(10, round(rng.gauss(6, 1.8)))),
+                "professor": rng.choice(SAMPLE_PROFESSORS),
+                "semester": rng.choice(semesters),
+                "user_id": sample_user_id(n),
+                "submitted_at": anchor - timedelta(seconds=rng.randint(1, 365 * 86400))
+            }
+    return _insert_in_batches("class_submissions", documents(), batch_size)
+
+def generate_professor_ratings(task):
+    """Insert the ratings for one class code across every major offering it
+
+    The unique key is (user_id, professor, class_code), so each professor's
+    raters for the class are drawn once and split across those majors.
+    """
+    seed, code, majors, users, count, batch_size, anchor = task
+    rng = random.Random(f"{seed}:ratings:{code}")
+    semesters = _semesters(anchor.year)[:3]
+
+    def documents():
+        for professor in rng.sample(SAMPLE_PROFESSORS, PROFESSORS_PER_CLASS):
+            raters = rng.sample(range(1, users + 1), count * len(majors))
+            for i, n in enumerate(raters):
+                yield {
+                    "professor": professor,
+                    "class_code": code,
+                    "rating": max(1.0, min(5.0, round(rng.gauss(3.5, 0.8), 1))),
+                    "review": rng.choice(REVIEW_TEMPLATES).format(professor=professor),
+                    "major": majors[i % len(majors)],
+                    "semester": rng.choice(semesters),
+                    "user_id": sample_user_id(n),
+                    "submitted_at": anchor - timedelta(seconds=rng.randint(1, 365 * 86400))
+                }
+    return _insert_in_batches("professor_ratings", documents(), batch_size)
+
+async def finish_generated_database():
+    """Build the indexes and rollups once the raw documents are loaded"""
+    db_manager.connect()
+    try:
+        print("🔧 Building indexes...")
+        await db_manager.create_indexes()
+        print("🔄 Rebuilding rollups...")
+        return await db_manager.rebuild_rollups()
+    finally:
+        await mongo_db.close()
+
+def generate_database(args):
+    """Generate a deterministic dataset at args.scale across worker processes"""
+    users = args.users or USERS_PER_SCALE * args.scale
+    per_class = args.submissions_per_class or SUBMISSIONS_PER_CLASS_PER_SCALE * args.scale
+    per_professor = args.ratings_per_professor or RATINGS_PER_PROFESSOR_PER_SCALE * args.scale
+
+    # A code listed twice in a major (or shared by majors) is still one class per major
+    class_names = {}
+    majors_by_code = {}
+    for major, courses in UNC_COURSES.items():
+        for course_string in courses:
+            code, name = parse_course_code_and_name(course_string)
+            if (major, code) not in class_names:
+                class_names[(major, code)] = name
+                majors_by_code.setdefault(code, []).append(major)
+
+    most_majors = max(len(majors) for majors in majors_by_code.values())
+    if users < per_class or users < per_professor * most_majors:
+        raise SystemExit(
+            f"❌ --users must be at least {max(per_class, per_professor * most_majors)} "
+            "so every class and professor gets distinct raters"
+        )
+
+    # Timestamps and semesters are relative to a fixed anchor so a seed always
+    # yields the same data, whatever the current date
+    anchor = args.anchor_date
+    submission_tasks = [
+        (args.seed, major, code, name, users, per_class, args.batch_size, anchor)
+        for (major, code), name in class_names.items()
+    ]
+    rating_tasks = [
+        (args.seed, code, majors, users, per_professor, args.batch_size, anchor)
+        for code, majors in majors_by_code.items()
+    ]
+    expected_submissions = len(submission_tasks) * per_class
+    expected_ratings = sum(PROFESSORS_PER_CLASS * per_professor * len(majors) for majors in majors_by_code.values())
+
+    print(f"🚀 Generating {expected_submissions:,} submissions and {expected_ratings:,} ratings "
+          f"from {users:,} users (seed {args.seed}, {args.workers} workers, batches of {args.batch_size:,})")
+
+    client = MongoClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    database = client[os.getenv("DATABASE_NAME", "studysync")]
+    print("🧹 Dropping existing submissions and ratings...")
+    # Dropped rather than emptied: loading without indexes and building them after is much faster
+    database.class_submissions.drop()
+    database.professor_ratings.drop()
+    client.close()
+
+    started = time.perf_counter()
+    inserted = 0
+    last_report = started
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers, initializer=_init_generator_worker) as pool:
+        results = itertools.chain(
+            pool.imap_unordered(generate_class_submissions, submission_tasks),
+            pool.imap_unordered(generate_professor_ratings, rating_tasks)
+        )
+        for count in results:
+            inserted += count
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                print(f"   ⏱️  {inserted:,} documents ({inserted / (now - started):,.0f}/s)")
+                last_report = now
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Inserted {inserted:,} documents in {elapsed:.1f}s ({inserted / elapsed:,.0f}/s)")
+
+    counts = asyncio.run(finish_generated_database())
+    print(f"🎉 Rollups rebuilt: {counts}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the StudySync database with sample or generated data")
+    parser.add_argument("--seed", type=int, help="Random seed, for reproducible data")
+    parser.add_argument("--generate", action="store_true",
+                        help="Generate a large synthetic dataset in parallel instead of the sample data")
+    parser.add_argument("--scale", type=int, default=1,
+                        help=f"Generator scale factor: {USERS_PER_SCALE} users, {SUBMISSIONS_PER_CLASS_PER_SCALE} "
+                             f"submissions per class and {RATINGS_PER_PROFESSOR_PER_SCALE} ratings per professor each")
+    parser.add_argument("--users", type=int, help="Override the number of distinct users")
+    parser.add_argument("--submissions-per-class", type=int, help="Override submissions per class")
+    parser.add_argument("--ratings-per-professor", type=int, help="Override ratings per professor per class and major")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Documents per insert_many")
+    parser.add_argument("--anchor-date", type=datetime.fromisoformat, default=datetime(2025, 6, 1),
+                        help="Generated data covers the year before this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if args.generate:
+        if args.seed is None:
+            args.seed = 0
+        generate_database(args)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        asyncio.run(initialize_database())
 
 if __name__ == "__main__":
-    initialize_database()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,10 +1,15 @@
 """
 Revamped StudySync API - UNC Class and Professor Rating System
 """
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.routing import Match
+from contextlib import asynccontextmanager
 from typing import List, Optional
+import hashlib
+import time
 import jwt
 import os
 from datetime import datetime, timedelta
@@ -13,17 +18,74 @@ from dotenv import load_dotenv
 load_dotenv()
 from auth_models import (
     User, UserCreate, LoginRequest, ClassDifficultySubmission, 
-    ProfessorRating, ClassRanking, MajorStats
+    ProfessorRating, ClassRanking, MajorStats, BatchSubmission, ProfessorSummary, SearchResult,
+    DifficultyTrend
 )
-from database import db_manager
+from mongo_db import mongo_db
+from database import db_manager, semester_key, PROFESSOR_RATINGS_PAGE_SIZE
+from migrate import apply_migrations
+from cache import query_cache, user_cache
+from passwords import password_hasher, PasswordPoolBusy
+from admission import auth_admission, AdmissionRejected, forwarded_client_ip, TRUSTED_PROXY_HOPS
+from ingest import ingest_queue, IngestQueueFull, WRITE_BEHIND_ENABLED
+from export_data import ndjson_lines, EXPORT_COLLECTIONS
+from responses import fast_response
+from slow_queries import slow_query_recorder
+from search import search_index, MAX_RESULTS, SEARCH_INDEX_REFRESH_SECONDS
+from analytics import analytics_snapshot, ANALYTICS_SNAPSHOT_ENABLED, ANALYTICS_REFRESH_SECONDS
+from metrics import registry, http_request_duration, http_requests_in_flight, PROMETHEUS_CONTENT_TYPE
 
-app = FastAPI(title="StudySync - UNC Class Rating System", version="2.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to the database in this worker on startup, close it on shutdown
+    
+    Indexes are managed separately by migrate.py, which deploys run before
+    starting workers; the single-process development server applies them here.
+    """
+    db_manager.connect()
+    try:
+        await mongo_db.ping()
+    except Exception:
+        # The client reconnects on demand, so a brief outage shouldn't stop the worker
+        print("⚠️  Starting without a database connection; /health reports its status")
+    else:
+        if ENVIRONMENT == "development":
+            await apply_migrations()
+    await slow_query_recorder.start(mongo_db.db)
+    try:
+        print(f"🔎 Search index built with {await db_manager.load_search_index()} entries")
+    except Exception as e:
+        print(f"⚠️  Search index unavailable until the next refresh: {e}")
+    await search_index.start_refresh(db_manager.load_search_index, SEARCH_INDEX_REFRESH_SECONDS)
+    if ANALYTICS_SNAPSHOT_ENABLED:
+        # Loads in the background; reads use MongoDB until it is ready
+        await analytics_snapshot.start(
+            db_manager.class_submissions, db_manager.professor_ratings, db_manager.major_versions,
+            ANALYTICS_REFRESH_SECONDS
+        )
+    if WRITE_BEHIND_ENABLED:
+        await ingest_queue.start()
+    yield
+    if WRITE_BEHIND_ENABLED:
+        # Drain queued submissions before the connection closes
+        await ingest_queue.stop()
+    await analytics_snapshot.stop()
+    await search_index.stop_refresh()
+    await slow_query_recorder.stop()
+    password_hasher.shutdown()
+    await mongo_db.close()
+
+API_VERSION = "2.0.0"
+
+app = FastAPI(title="StudySync - UNC Class Rating System", version=API_VERSION, lifespan=lifespan)
 
 # Security
 security = HTTPBearer()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "fallback-secret-key-for-dev")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+READ_CACHE_MAX_AGE = int(os.getenv("READ_CACHE_MAX_AGE", 0))
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
 
 # CORS Configuration
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
@@ -37,6 +99,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time each request under its route template, e.g. /majors/{major}/classes"""
+    # The router only resolves the route after this middleware, so match it up front
+    route = next((r for r in app.router.routes if r.matches(request.scope)[0] == Match.FULL), None)
+    route_path = route.path if route is not None else "unmatched"
+
+    http_requests_in_flight.inc(method=request.method, route=route_path)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec(method=request.method, route=route_path)
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            method=request.method, route=route_path, status=str(status_code)
+        )
+
+# Pool and queue state, read when /metrics is scraped
+registry.gauge("studysync_password_pool_pending", "bcrypt jobs queued or running",
+               function=lambda: password_hasher.stats()["pending"])
+registry.gauge("studysync_query_cache_hit_ratio", "Query cache hit ratio",
+               function=lambda: query_cache.stats()["hit_ratio"])
+registry.gauge("studysync_write_behind_depth", "Submissions waiting in the write-behind queue",
+               function=lambda: ingest_queue.stats()["depth"] if WRITE_BEHIND_ENABLED else 0)
+
 def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     if expires_delta:
@@ -48,7 +139,7 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token and return user ID"""
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
@@ -65,9 +156,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
             detail="Invalid authentication credentials"
         )
 
-def get_current_user(user_id: str = Depends(verify_token)) -> User:
+async def get_current_user(user_id: str = Depends(verify_token)) -> User:
     """Get current authenticated user"""
-    user = db_manager.get_user_by_id(user_id)
+    user = await db_manager.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -75,6 +166,71 @@ def get_current_user(user_id: str = Depends(verify_token)) -> User:
         )
     return user
 
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Require an authenticated user listed in ADMIN_EMAILS"""
+    if current_user.email not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+def major_etag(major: str, resource: str, version: int) -> str:
+    """ETag for a per-major read, derived from the major's write version"""
+    digest = hashlib.sha1(f"{API_VERSION}:{resource}:{major}:{version}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison: W/"x" and "x" name the same representation
+    opaque = lambda tag: tag[2:] if tag.startswith("W/") else tag
+    candidates = [opaque(tag.strip()) for tag in header.split(",")]
+    return "*" in candidates or opaque(etag) in candidates
+
+def conditional_headers(etag: str) -> dict:
+    """Caching headers for per-major reads; clients revalidate with If-None-Match"""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={READ_CACHE_MAX_AGE}, must-revalidate",
+        "Vary": "Accept"
+    }
+
+def auth_busy_error() -> HTTPException:
+    """Error for auth requests shed because the password pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def client_ip(request: Request) -> Optional[str]:
+    """Caller's address, read from the entry our own proxies appended to X-Forwarded-For"""
+    peer = request.client.host if request.client else None
+    return forwarded_client_ip(request.headers.get("x-forwarded-for"), peer, TRUSTED_PROXY_HOPS)
+
+def admission_error(rejected: AdmissionRejected) -> HTTPException:
+    """Error for auth requests shed by admission control"""
+    if rejected.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        detail = "Too many authentication attempts, please retry later"
+    else:
+        detail = "Authentication is busy, please retry shortly"
+    return HTTPException(
+        status_code=rejected.status_code,
+        detail=detail,
+        headers={"Retry-After": str(rejected.retry_after)}
+    )
+
+def ingest_busy_error() -> HTTPException:
+    """Error for submissions shed because the write-behind queue is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many pending submissions, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
 # Health check
 @app.get("/")
 async def root():
@@ -86,10 +242,11 @@ async def root():
 
 # Authentication endpoints
 @app.post("/auth/register", response_model=dict)
-def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate, request: Request):
     """Register a new user with UNC email"""
     try:
-        user = db_manager.create_user(user_data)
+        async with auth_admission.admit("register", client_ip(request), user_data.email):
+            user = await db_manager.create_user(user_data)
         access_token = create_access_token(user.id)
         
         return {
@@ -105,13 +262,25 @@ def register_user(user_data: UserCreate):
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except PasswordPoolBusy:
+        auth_admission.record_busy("register")
+        raise auth_busy_error()
     except Exception as e:
         raise HTTPException(status_code=500, detail="Registration failed")
 
 @app.post("/auth/login", response_model=dict)
-def login_user(login_data: LoginRequest):
+async def login_user(login_data: LoginRequest, request: Request):
     """Login user with email and password"""
-    user = db_manager.authenticate_user(login_data.email, login_data.password)
+    try:
+        async with auth_admission.admit("login", client_ip(request), login_data.email):
+            user = await db_manager.authenticate_user(login_data.email, login_data.password)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except PasswordPoolBusy:
+        auth_admission.record_busy("login")
+        raise auth_busy_error()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,42 +308,134 @@ def login_user(login_data: LoginRequest):
     }
 
 @app.get("/auth/me", response_model=User)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 # Major endpoints
 @app.get("/majors", response_model=List[str])
-def get_all_majors():
+async def get_all_majors():
     """Get all available majors"""
     try:
-        majors = db_manager.get_all_majors()
+        majors = await db_manager.get_all_majors()
         return majors
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve majors")
 
 @app.get("/majors/{major}/stats", response_model=MajorStats)
-def get_major_statistics(major: str):
+async def get_major_statistics(major: str, request: Request, response: Response):
     """Get statistics for a specific major"""
     try:
-        stats = db_manager.get_major_stats(major)
+        version = await db_manager.get_major_version(major, snapshot=True)
+        etag = major_etag(major, "stats", version)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
+        
+        stats = await db_manager.get_major_stats(major, version=version)
+        response.headers.update(conditional_headers(etag))
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve major statistics")
 
 @app.get("/majors/{major}/classes", response_model=List[ClassRanking])
-def get_class_rankings(major: str, limit: int = 50):
-    """Get class difficulty rankings for a specific major"""
+async def get_class_rankings(
+    major: str,
+    request: Request,
+    response: Response,
+    limit: int = 50,
+    distribution: bool = False,
+    from_semester: Optional[str] = None,
+    to_semester: Optional[str] = None
+):
+    """Get class difficulty rankings for a specific major
+    
+    Pass distribution=true to include each class's difficulty histogram,
+    median, quartiles and standard deviation. from_semester and to_semester
+    (e.g. "Fall 2023", both inclusive) rank only submissions from that range.
+    """
+    semester_range = None
+    if from_semester or to_semester:
+        try:
+            semester_range = (
+                semester_key(from_semester) if from_semester else 0,
+                semester_key(to_semester) if to_semester else 99999
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        rankings = db_manager.get_class_rankings_by_major(major, limit)
+        resource = f"classes:{limit}:{int(distribution)}"
+        if semester_range:
+            resource += ":{}-{}".format(*semester_range)
+        # Semester ranges are always read from MongoDB; other rankings may come from the snapshot
+        version = await db_manager.get_major_version(major, snapshot=semester_range is None)
+        etag = major_etag(major, resource, version)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
+        
+        if semester_range:
+            rankings = await db_manager.get_class_rankings_for_semesters(
+                major, limit, *semester_range, include_distribution=distribution, version=version
+            )
+        else:
+            rankings = await db_manager.get_class_rankings_by_major(
+                major, limit, include_distribution=distribution, version=version
+            )
+        
+        # Rankings are built internally, so the fast path skips response_model validation
+        fast = fast_response(request, rankings, headers=conditional_headers(etag))
+        if fast:
+            return fast
+        
+        response.headers.update(conditional_headers(etag))
         return rankings
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve class rankings")
 
+@app.get("/majors/{major}/trend", response_model=DifficultyTrend)
+async def get_major_trend(major: str, request: Request, response: Response):
+    """Get a major's average difficulty per semester, oldest first"""
+    try:
+        version = await db_manager.get_major_version(major)
+        etag = major_etag(major, "trend", version)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
+        trend = await db_manager.get_major_trend(major, version=version)
+        response.headers.update(conditional_headers(etag))
+        return trend
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve major trend")
+
+@app.get("/majors/{major}/classes/{class_code}/trend", response_model=DifficultyTrend)
+async def get_class_trend(major: str, class_code: str, request: Request, response: Response):
+    """Get a class's difficulty per semester, oldest first"""
+    try:
+        version = await db_manager.get_major_version(major)
+        etag = major_etag(major, f"trend:{class_code}", version)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
+        trend = await db_manager.get_class_trend(major, class_code, version=version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve class trend")
+    
+    if trend is None:
+        raise HTTPException(status_code=404, detail="No submissions for this class")
+    response.headers.update(conditional_headers(etag))
+    return trend
+
+# Search endpoint
+@app.get("/search", response_model=List[SearchResult])
+async def search(q: str, limit: int = 10, kind: Optional[str] = None):
+    """Typeahead search over class codes, class names and professors"""
+    if kind not in (None, "class", "professor"):
+        raise HTTPException(status_code=400, detail='kind must be "class" or "professor"')
+    return search_index.search(q, limit=max(1, min(limit, MAX_RESULTS)), kind=kind)
+
 # Class difficulty submission endpoints
 @app.post("/submissions/difficulty")
-def submit_class_difficulty(
+async def submit_class_difficulty(
     submission: ClassDifficultySubmission,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
     """Submit a class difficulty rating"""
@@ -189,11 +450,20 @@ def submit_class_difficulty(
                 detail="You can only submit ratings for your own major"
             )
         
-        success = db_manager.submit_class_difficulty(submission)
+        if WRITE_BEHIND_ENABLED:
+            ingest_queue.enqueue_submission(submission)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return {"message": "Difficulty rating queued for submission"}
+        
+        success = await db_manager.submit_class_difficulty(submission)
         if success:
             return {"message": "Difficulty rating submitted successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to submit rating")
+    except HTTPException:
+        raise
+    except IngestQueueFull:
+        raise ingest_busy_error()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -201,8 +471,9 @@ def submit_class_difficulty(
 
 # Professor rating endpoints
 @app.post("/submissions/professor")
-def submit_professor_rating(
+async def submit_professor_rating(
     rating: ProfessorRating,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
     """Submit a professor rating"""
@@ -217,32 +488,131 @@ def submit_professor_rating(
                 detail="You can only submit ratings for your own major"
             )
         
-        success = db_manager.submit_professor_rating(rating)
+        if WRITE_BEHIND_ENABLED:
+            ingest_queue.enqueue_rating(rating)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return {"message": "Professor rating queued for submission"}
+        
+        success = await db_manager.submit_professor_rating(rating)
         if success:
             return {"message": "Professor rating submitted successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to submit rating")
+    except HTTPException:
+        raise
+    except IngestQueueFull:
+        raise ingest_busy_error()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to submit rating")
 
+# Batch submission endpoint
+@app.post("/submissions/batch")
+async def submit_batch(
+    batch: BatchSubmission,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Submit several difficulty and professor ratings at once"""
+    results = [None] * len(batch.items)
+    submissions, ratings = [], []
+    
+    for index, item in enumerate(batch.items):
+        item_type = "difficulty" if isinstance(item, ClassDifficultySubmission) else "professor"
+        
+        # Set the user_id from the authenticated user
+        item.user_id = current_user.id
+        
+        # Ensure the item is for the user's major
+        if item.major != current_user.major:
+            results[index] = {
+                "index": index,
+                "type": item_type,
+                "status": "rejected",
+                "detail": "You can only submit ratings for your own major"
+            }
+        elif item_type == "difficulty":
+            submissions.append((index, item))
+        else:
+            ratings.append((index, item))
+    
+    if WRITE_BEHIND_ENABLED:
+        try:
+            for _, item in submissions:
+                ingest_queue.enqueue_submission(item)
+            for _, item in ratings:
+                ingest_queue.enqueue_rating(item)
+        except IngestQueueFull:
+            raise ingest_busy_error()
+        
+        for item_type, accepted in (("difficulty", submissions), ("professor", ratings)):
+            for index, _ in accepted:
+                results[index] = {"index": index, "type": item_type, "status": "queued"}
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"results": results}
+    
+    try:
+        statuses = await db_manager.submit_batch(
+            [item for _, item in submissions],
+            [item for _, item in ratings]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to submit ratings")
+    
+    for item_type, accepted in (("difficulty", submissions), ("professor", ratings)):
+        for (index, _), item_status in zip(accepted, statuses[item_type]):
+            results[index] = {"index": index, "type": item_type, "status": item_status}
+    
+    return {"results": results}
+
 @app.get("/professors/{professor}/ratings")
-def get_professor_ratings(professor: str, class_code: Optional[str] = None):
-    """Get ratings for a specific professor"""
+async def get_professor_ratings(
+    professor: str,
+    class_code: Optional[str] = None,
+    limit: int = PROFESSOR_RATINGS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of ratings for a specific professor
+    
+    Pass next_cursor back as cursor for the following page, and fields
+    (comma separated, e.g. "rating,semester") to skip review text.
+    """
     try:
-        ratings = db_manager.get_professor_ratings(professor, class_code)
+        ratings, next_cursor = await db_manager.get_professor_ratings(
+            professor,
+            class_code,
+            limit=limit,
+            cursor=cursor,
+            fields=fields.split(",") if fields else None
+        )
         return {
             "professor": professor,
             "class_code": class_code,
-            "ratings": ratings
+            "ratings": ratings,
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve professor ratings")
 
+@app.get("/professors/{professor}/summary", response_model=ProfessorSummary)
+async def get_professor_summary(professor: str):
+    """Get a professor's average ratings and rating distribution"""
+    try:
+        summary = await db_manager.get_professor_summary(professor)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve professor summary")
+    
+    if not summary:
+        raise HTTPException(status_code=404, detail="Professor not found")
+    return summary
+
 # Admin endpoints (for future use)
 @app.get("/admin/users", response_model=List[dict])
-def get_all_users(current_user: User = Depends(get_current_user)):
+async def get_all_users(current_user: User = Depends(get_current_user)):
     """Get all users (admin only)"""
     # In a real application, you'd check if the user is an admin
     # For now, we'll just return basic info
@@ -252,20 +622,54 @@ def get_all_users(current_user: User = Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve users")
 
+@app.get("/admin/export/{collection}")
+async def export_collection(
+    collection: str,
+    major: Optional[str] = None,
+    semester: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Stream class_submissions or professor_ratings as NDJSON"""
+    if collection not in EXPORT_COLLECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown export collection")
+    
+    return StreamingResponse(
+        ndjson_lines(collection, major, semester, since, until),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection}.ndjson"'}
+    )
+
+@app.get("/admin/slow-queries")
+async def get_slow_queries(limit: int = 50, admin_user: User = Depends(get_admin_user)):
+    """Recent MongoDB commands over SLOW_QUERY_THRESHOLD_MS, slowest first"""
+    return {
+        "stats": slow_query_recorder.stats(),
+        "queries": slow_query_recorder.entries(limit=max(1, min(limit, 500)))
+    }
+
 # Health check endpoints
 @app.get("/health")
 async def health_check():
     """Comprehensive health check endpoint"""
     try:
         # Check database connection
-        db_health = db_manager.get_database_health()
+        db_health = await db_manager.get_database_health()
         
         return {
             "status": "healthy",
             "timestamp": datetime.utcnow(),
-            "version": "2.0.0",
+            "version": API_VERSION,
             "environment": ENVIRONMENT,
             "database": db_health,
+            "cache": query_cache.stats(),
+            "user_cache": user_cache.stats(),
+            "password_pool": password_hasher.stats(),
+            "auth_admission": auth_admission.stats(),
+            "search_index": search_index.stats(),
+            "analytics_snapshot": analytics_snapshot.stats() if ANALYTICS_SNAPSHOT_ENABLED else None,
+            "write_behind": ingest_queue.stats() if WRITE_BEHIND_ENABLED else None,
             "services": {
                 "auth": "operational",
                 "ratings": "operational"
@@ -281,6 +685,11 @@ async def health_check():
             }
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
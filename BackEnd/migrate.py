@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+StudySync Database Migration Script
+Creates the indexes the API relies on and backfills rollup collections that
+a deploy introduces; run once per deploy, not per worker
+"""
+
+import asyncio
+from mongo_db import mongo_db
+from database import db_manager
+
+async def apply_migrations():
+    """Create or confirm every collection index, then backfill empty rollups
+    
+    Idempotent; expects db_manager to be connected already.
+    """
+    print("🔧 Applying database indexes...")
+    await db_manager.create_indexes()
+    print("✅ Indexes are up to date")
+    
+    missing = await db_manager.missing_rollups()
+    if missing:
+        print(f"🔄 Rebuilding rollups ({', '.join(missing)} empty)...")
+        for collection, count in (await db_manager.rebuild_rollups()).items():
+            print(f"   ✅ {collection}: {count} documents")
+
+async def migrate():
+    """Connect and apply the migrations once, as a release step"""
+    db_manager.connect()
+    try:
+        await mongo_db.ping()
+        await apply_migrations()
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        raise
+    finally:
+        await mongo_db.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
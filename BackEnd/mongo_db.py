@@ -1,36 +1,52 @@
 """MongoDB database connection and configuration"""
 import os
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from dotenv import load_dotenv
 
+from metrics import mongo_command_metrics
+from slow_queries import slow_query_recorder
+
 load_dotenv()
 
 class MongoDatabase:
     def __init__(self):
         self.client = None
         self.db = None
-        self.connect()
     
     def connect(self):
         """Connect to MongoDB"""
+        # Called per process after fork (from the app lifespan or a script),
+        # never at import time
+        if self.client is not None:
+            return
         try:
             mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
             database_name = os.getenv("DATABASE_NAME", "studysync")
             
-            # Production-ready connection options
-            self.client = MongoClient(
+            # Production-ready connection options; the async client defers
+            # connecting until the first operation runs on the event loop
+            self.client = AsyncMongoClient(
                 mongodb_url, 
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=5000,
-                maxPoolSize=50,
-                retryWrites=True
+                # Each worker process has its own client, so these are per worker
+                maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+                minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+                retryWrites=True,
+                event_listeners=[mongo_command_metrics, slow_query_recorder]
             )
             self.db = self.client[database_name]
             
-            # Test the connection
-            self.client.admin.command('ping')
-            print(f"✅ Connected to MongoDB: {database_name}")
-            
+        except Exception as e:
+            print(f"❌ Failed to connect to MongoDB: {e}")
+            print("Please ensure MongoDB is running or check MONGODB_URL in .env")
+            raise
+    
+    async def ping(self):
+        """Test the connection"""
+        try:
+            await self.client.admin.command('ping')
+            print(f"✅ Connected to MongoDB: {self.db.name}")
         except Exception as e:
             print(f"❌ Failed to connect to MongoDB: {e}")
             print("Please ensure MongoDB is running or check MONGODB_URL in .env")
@@ -40,18 +56,20 @@ class MongoDatabase:
         """Get a collection from the database"""
         return self.db[collection_name]
     
-    def get_health_status(self):
+    async def get_health_status(self):
         """Check database health for monitoring"""
         try:
-            self.client.admin.command('ping')
+            await self.client.admin.command('ping')
             return {"status": "healthy", "database": self.db.name}
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
     
-    def close(self):
+    async def close(self):
         """Close the database connection"""
         if self.client:
-            self.client.close()
+            await self.client.close()
+            self.client = None
+            self.db = None
 
 # Global database instance
 mongo_db = MongoDatabase()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Password hashing offloaded to a dedicated process pool"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from metrics import password_duration
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """Hash a password using bcrypt"""
+    # Imported here: only the pool's worker processes ever need bcrypt
+    import bcrypt
+    salt = bcrypt.gensalt(rounds=rounds)
+    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool is saturated or too slow to answer"""
+
+class PasswordHasher:
+    """Runs bcrypt in worker processes so it never holds the API's GIL
+
+    At most max_pending jobs may be queued or running at once; beyond that,
+    and for jobs that take longer than timeout seconds, PasswordPoolBusy is
+    raised so callers can fail fast instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, timeout: float = 5.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use, so each server worker gets its own pool after fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _discard_broken_executor(self, executor: ProcessPoolExecutor):
+        """Drop a pool whose worker died (e.g. OOM-killed) so the next job starts a fresh one"""
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolBusy("Password pool queue is full")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            job = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard_broken_executor(executor)
+            raise PasswordPoolBusy("Password pool worker died; restarting the pool")
+        self._pending += 1
+        # A slot is held until the worker actually finishes, even after a timeout
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except BrokenProcessPool:
+            self._discard_broken_executor(executor)
+            password_duration.observe(time.perf_counter() - started, operation=operation, outcome="broken")
+            raise PasswordPoolBusy("Password pool worker died; restarting the pool")
+        except asyncio.TimeoutError:
+            job.cancel()
+            self.timeouts += 1
+            password_duration.observe(time.perf_counter() - started, operation=operation, outcome="timeout")
+            raise PasswordPoolBusy("Password pool timed out")
+        self.completed += 1
+        password_duration.observe(time.perf_counter() - started, operation=operation, outcome="success")
+        return result
+
+    def _release(self):
+        self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password in the pool"""
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash in the pool"""
+        return await self._run("verify", verify_password, password, hashed_password)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth and outcome counters"""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts
+        }
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_POOL_WORKERS", 2)),
+    max_pending=int(os.getenv("PASSWORD_POOL_MAX_PENDING", 16)),
+    timeout=float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", 5))
+)
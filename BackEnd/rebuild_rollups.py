@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+StudySync Rollup Rebuild Script
+Regenerates the class and professor rollup collections from raw submissions
+"""
+
+import asyncio
+from mongo_db import mongo_db
+from database import db_manager
+
+async def rebuild_rollups():
+    """Rebuild every rollup collection from class_submissions and professor_ratings"""
+    print("🔄 Rebuilding rollup collections...")
+    
+    db_manager.connect()
+    try:
+        counts = await db_manager.rebuild_rollups()
+        for collection, count in counts.items():
+            print(f"   ✅ {collection}: {count} documents")
+        print("\n🎉 Rollups rebuilt!")
+    except Exception as e:
+        print(f"❌ Error during rollup rebuild: {e}")
+        raise
+    finally:
+        await mongo_db.close()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_rollups())
@@ -0,0 +1,41 @@
+"""Fast response serialization for trusted internal results"""
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+# Serve trusted results as orjson bytes instead of validating them against
+# the response model first; MessagePack is always available on request
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "false").lower() == "true"
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+class OrjsonResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+def fast_response(request: Request, content: Any, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """Serialize content directly when the client or deployment opts in, else None"""
+    accept = request.headers.get("accept", "")
+    if MSGPACK_MEDIA_TYPE in accept or "application/x-msgpack" in accept:
+        return MsgPackResponse(content, headers=headers)
+    if FAST_RESPONSES:
+        return OrjsonResponse(content, headers=headers)
+    return None
@@ -0,0 +1,253 @@
+"""In-memory typeahead index over class codes, class names and professors"""
+import asyncio
+import heapq
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+SEARCH_MAX_PREFIX_LENGTH = int(os.getenv("SEARCH_MAX_PREFIX_LENGTH", 12))
+SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", 300))
+
+# Most results a single query returns
+MAX_RESULTS = 50
+
+# Prefixes matching more entries than this keep a precomputed top list
+TOP_LIST_MIN_MATCHES = 4 * MAX_RESULTS
+
+# Share of a query's trigrams an entry must contain to match when no prefix does
+TRIGRAM_MATCH_RATIO = 0.5
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def normalize(text: str) -> str:
+    return " ".join(_TOKEN.findall(text.lower()))
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchEntry:
+    """One searchable class (across every major offering it) or professor"""
+    __slots__ = ("kind", "key", "label", "class_code", "class_name", "majors", "count", "normalized_terms")
+
+    def __init__(self, kind: str, key: str, label: str, class_code: Optional[str] = None,
+                 class_name: Optional[str] = None):
+        self.kind = kind
+        self.key = key
+        self.label = label
+        self.class_code = class_code
+        self.class_name = class_name
+        self.majors: Set[str] = set()
+        self.count = 0
+        self.normalized_terms = [normalize(term) for term in self.terms()]
+
+    def terms(self) -> List[str]:
+        if self.kind == "class":
+            # "COMP 550" is also matched when typed as "comp550"
+            return [self.class_code, self.class_code.replace(" ", ""), self.class_name]
+        return [self.label]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.label,
+            "class_code": self.class_code,
+            "class_name": self.class_name,
+            "majors": sorted(self.majors),
+            "count": self.count
+        }
+
+class SearchIndex:
+    """Prefix and trigram index answering typeahead queries from memory
+
+    Every word of a code, class name or professor name is indexed by its
+    prefixes (up to SEARCH_MAX_PREFIX_LENGTH characters), so a query matches
+    entries holding a word that starts with each of its words. Queries with
+    no prefix match fall back to trigram overlap, which tolerates typos and
+    infix fragments. Results are ranked by submission count: difficulty
+    submissions for classes, ratings for professors.
+
+    Short single-word queries match much of the catalogue, so for prefixes
+    with more than TOP_LIST_MIN_MATCHES entries the best MAX_RESULTS are kept
+    per (prefix, kind) once first asked for, and updated as counts grow,
+    instead of ranking every match on each keystroke.
+    """
+
+    def __init__(self, max_prefix_length: int = 12):
+        self.max_prefix_length = max_prefix_length
+        self._entries: Dict[Tuple[str, str], SearchEntry] = {}
+        self._prefixes: Dict[str, Set[Tuple[str, str]]] = {}
+        self._trigrams: Dict[str, Set[Tuple[str, str]]] = {}
+        self._top: Dict[Tuple[str, Optional[str]], List[Tuple[str, str]]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, kind: str, key: str, label: str, **fields) -> SearchEntry:
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            entry = self._entries[(kind, key)] = SearchEntry(kind, key, label, **fields)
+            self._index(entry)
+        return entry
+
+    def _index(self, entry: SearchEntry):
+        entry_id = (entry.kind, entry.key)
+        for term in entry.terms():
+            for word in tokens(term):
+                for length in range(1, min(len(word), self.max_prefix_length) + 1):
+                    self._prefixes.setdefault(word[:length], set()).add(entry_id)
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(entry_id)
+
+    def add_class(self, class_code: str, class_name: str, major: str, count: int = 0):
+        """Record a class offered by major, adding count submissions"""
+        entry = self._entry("class", class_code, class_code, class_code=class_code, class_name=class_name)
+        entry.majors.add(major)
+        entry.count += count
+        self._promote(entry)
+
+    def add_professor(self, professor: str, major: Optional[str] = None, count: int = 0):
+        """Record a professor (teaching in major, if known), adding count ratings"""
+        entry = self._entry("professor", professor, professor)
+        if major:
+            entry.majors.add(major)
+        entry.count += count
+        self._promote(entry)
+
+    def replace(self, other: "SearchIndex"):
+        """Take over another index's contents (used to swap in a rebuilt index)"""
+        self._entries = other._entries
+        self._prefixes = other._prefixes
+        self._trigrams = other._trigrams
+        self._top = other._top
+
+    def _rank(self, entry_id: Tuple[str, str], phrase: str) -> Tuple[bool, int]:
+        entry = self._entries[entry_id]
+        # Entries whose name starts with the whole query outrank other matches
+        leading = any(term.startswith(phrase) for term in entry.normalized_terms)
+        return (leading, entry.count)
+
+    def _top_matches(self, prefix: str, kind: Optional[str]) -> List[Tuple[str, str]]:
+        """The best MAX_RESULTS entries with a word starting with prefix, built on first use"""
+        key = (prefix, kind)
+        top = self._top.get(key)
+        if top is None:
+            candidates = self._prefixes.get(prefix, ())
+            if kind:
+                candidates = [entry_id for entry_id in candidates if entry_id[0] == kind]
+            top = self._top[key] = heapq.nlargest(
+                MAX_RESULTS, candidates, key=lambda entry_id: self._rank(entry_id, prefix)
+            )
+        return top
+
+    def _promote(self, entry: SearchEntry):
+        """Keep the cached top lists for entry's short prefixes current after it is added or counted"""
+        if not self._top:
+            return
+        entry_id = (entry.kind, entry.key)
+        prefixes = {
+            word[:length]
+            for term in entry.terms() for word in tokens(term)
+            for length in range(1, min(len(word), self.max_prefix_length) + 1)
+        }
+        for prefix in prefixes:
+            for kind in (None, entry.kind):
+                top = self._top.get((prefix, kind))
+                if top is None or entry_id in top:
+                    continue
+                if len(top) < MAX_RESULTS:
+                    top.append(entry_id)
+                    continue
+                # Counts only grow, so an entry enters a full list by beating its weakest member
+                weakest = min(range(len(top)), key=lambda i: self._rank(top[i], prefix))
+                if self._rank(entry_id, prefix) > self._rank(top[weakest], prefix):
+                    top[weakest] = entry_id
+
+    def _prefix_matches(self, words: List[str]) -> Set[Tuple[str, str]]:
+        matches: Optional[Set[Tuple[str, str]]] = None
+        # Rarest word first keeps the intersections small
+        for word in sorted(words, key=lambda w: len(self._prefixes.get(w[:self.max_prefix_length], ()))):
+            candidates = self._prefixes.get(word[:self.max_prefix_length], set())
+            if len(word) > self.max_prefix_length:
+                # Beyond the indexed length, confirm the full word against the entry's terms
+                candidates = {
+                    entry_id for entry_id in candidates
+                    if any(part.startswith(word) for term in self._entries[entry_id].normalized_terms
+                           for part in term.split())
+                }
+            matches = set(candidates) if matches is None else matches & candidates
+            if not matches:
+                break
+        return matches or set()
+
+    def _trigram_matches(self, query: str) -> Set[Tuple[str, str]]:
+        grams = trigrams(query)
+        hits: Dict[Tuple[str, str], int] = {}
+        for gram in grams:
+            for entry_id in self._trigrams.get(gram, ()):
+                hits[entry_id] = hits.get(entry_id, 0) + 1
+        needed = max(1, int(len(grams) * TRIGRAM_MATCH_RATIO))
+        return {entry_id for entry_id, count in hits.items() if count >= needed}
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best matches for query, most submitted first"""
+        words = tokens(query)
+        if not words:
+            return []
+
+        phrase = normalize(query)
+        if len(words) == 1 and len(phrase) <= self.max_prefix_length and limit <= MAX_RESULTS and \
+                len(self._prefixes.get(phrase, ())) > TOP_LIST_MIN_MATCHES:
+            best = heapq.nlargest(limit, self._top_matches(phrase, kind), key=lambda e: self._rank(e, phrase))
+            return [self._entries[entry_id].to_dict() for entry_id in best]
+
+        matches = self._prefix_matches(words)
+        if not matches and len(normalize(query)) >= 3:
+            matches = self._trigram_matches(query)
+        if kind:
+            matches = {entry_id for entry_id in matches if entry_id[0] == kind}
+
+        best = heapq.nlargest(limit, matches, key=lambda entry_id: self._rank(entry_id, phrase))
+        return [self._entries[entry_id].to_dict() for entry_id in best]
+
+    async def start_refresh(self, loader: Callable[[], Awaitable[None]], interval: float):
+        """Rebuild the index every interval seconds, picking up other workers' writes"""
+        if interval <= 0 or self._refresh_task is not None:
+            return
+
+        async def refresh_forever():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await loader()
+                except Exception as e:
+                    print(f"⚠️  Search index refresh failed: {e}")
+
+        self._refresh_task = asyncio.create_task(refresh_forever())
+
+    async def stop_refresh(self):
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "classes": sum(1 for kind, _ in self._entries if kind == "class"),
+            "professors": sum(1 for kind, _ in self._entries if kind == "professor"),
+            "prefixes": len(self._prefixes),
+            "trigrams": len(self._trigrams),
+            "top_lists": len(self._top)
+        }
+
+# Global search index, built in the app lifespan and updated on submissions
+search_index = SearchIndex(max_prefix_length=SEARCH_MAX_PREFIX_LENGTH)
@@ -0,0 +1,260 @@
+"""Recorder for slow MongoDB commands, with sampled explain plans"""
+import asyncio
+import os
+import random
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 200))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+
+# Fields describing what a command asked for; their literal values are redacted
+SHAPE_FIELDS = ("filter", "query", "pipeline", "key")
+# Fields that never carry user data and are kept verbatim
+VERBATIM_FIELDS = ("sort", "projection", "hint", "limit")
+# Read commands that can be explained without side effects
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+# Driver bookkeeping that must not be sent back inside an explain
+DRIVER_FIELDS = {"lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "autocommit", "startTransaction"}
+
+def redact(value: Any) -> Any:
+    """Keep the keys and operators of a query document, replacing literals with "?"."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        redacted = [redact(item) for item in value]
+        # ["?", "?", ...] from an $in list says nothing more than ["?"]
+        if redacted and all(item == "?" for item in redacted):
+            return ["?"]
+        return redacted
+    return "?"
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Redacted summary of a command's filter, pipeline, sort and similar options"""
+    shape = {}
+    for field in SHAPE_FIELDS:
+        if field in command:
+            shape[field] = redact(command[field])
+    for field in VERBATIM_FIELDS:
+        if field in command:
+            shape[field] = command[field]
+    # Writes carry their filters inside each statement
+    for field in ("updates", "deletes"):
+        if field in command:
+            shape[field] = [redact(statement.get("q", {})) for statement in command[field]]
+    return shape
+
+def _find_stage(explain: Any, name: str) -> Optional[Dict[str, Any]]:
+    """First nested document under key name (aggregate explains nest it per stage)"""
+    if isinstance(explain, dict):
+        if isinstance(explain.get(name), dict):
+            return explain[name]
+        children = explain.values()
+    elif isinstance(explain, list):
+        children = explain
+    else:
+        return None
+    for child in children:
+        found = _find_stage(child, name)
+        if found is not None:
+            return found
+    return None
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Stage names of a winning plan, outermost first, e.g. ["SORT", "COLLSCAN"]"""
+    stages = []
+    while isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "queryPlan" in plan:
+            plan = plan["queryPlan"]
+        elif "inputStage" in plan:
+            plan = plan["inputStage"]
+        elif plan.get("inputStages"):
+            plan = plan["inputStages"][0]
+        else:
+            break
+    return stages
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of an executionStats explain that show how much work a query did"""
+    planner = _find_stage(explain, "queryPlanner") or {}
+    stats = _find_stage(explain, "executionStats") or {}
+    return {
+        "winning_plan": _plan_stages(planner.get("winningPlan")),
+        "n_returned": stats.get("nReturned"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "execution_time_ms": stats.get("executionTimeMillis")
+    }
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """pymongo listener keeping the slowest recent commands in a ring buffer
+
+    Commands at or above threshold_ms are recorded with their redacted shape.
+    A sample of the explainable ones is re-run as explain("executionStats")
+    by a background task, so plans are captured without delaying the request
+    that was slow.
+    """
+
+    def __init__(self, threshold_ms: float = 100, max_entries: int = 200, explain_sample_rate: float = 0.1):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self._in_flight: Dict[Tuple[int, object], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._explain_queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._database = None
+        self.recorded = 0
+        self.explained = 0
+        self.explain_errors = 0
+
+    # --- CommandListener ---
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name == "explain":
+            return
+        with self._lock:
+            self._in_flight[(event.request_id, event.connection_id)] = event.command
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, event.reply, None)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, None, str(event.failure.get("errmsg", "")) if isinstance(event.failure, dict) else None)
+
+    def _finish(self, event, reply: Optional[Dict[str, Any]], error: Optional[str]):
+        with self._lock:
+            command = self._in_flight.pop((event.request_id, event.connection_id), None)
+        duration_ms = event.duration_micros / 1000
+        if command is None or duration_ms < self.threshold_ms:
+            return
+
+        target = command.get(event.command_name)
+        entry = {
+            "recorded_at": datetime.utcnow(),
+            "command": event.command_name,
+            "collection": target if isinstance(target, str) else None,
+            "shape": command_shape(event.command_name, command),
+            "duration_ms": round(duration_ms, 2),
+            "docs_returned": self._docs_returned(reply),
+            "error": error,
+            "explain": None
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+        if (event.command_name in EXPLAINABLE_COMMANDS and error is None
+                and random.random() < self.explain_sample_rate
+                and not self._writes_output(command)):
+            self._schedule_explain(entry, command)
+
+    @staticmethod
+    def _docs_returned(reply: Optional[Dict[str, Any]]) -> Optional[int]:
+        if not reply:
+            return None
+        cursor = reply.get("cursor")
+        if isinstance(cursor, dict):
+            return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+        if "values" in reply:
+            return len(reply["values"])
+        return reply.get("n")
+
+    @staticmethod
+    def _writes_output(command: Dict[str, Any]) -> bool:
+        """Whether an aggregate ends in $out/$merge (never explained, even read-only)"""
+        pipeline = command.get("pipeline") or []
+        return any("$out" in stage or "$merge" in stage for stage in pipeline)
+
+    # --- Background explains ---
+
+    def _schedule_explain(self, entry: Dict[str, Any], command: Dict[str, Any]):
+        if self._loop is None or self._explain_queue is None:
+            return
+        explainable = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+
+        def enqueue():
+            try:
+                self._explain_queue.put_nowait((entry, explainable))
+            except asyncio.QueueFull:
+                # Explains are best effort; drop rather than pile up behind a slow server
+                pass
+        self._loop.call_soon_threadsafe(enqueue)
+
+    async def start(self, database):
+        """Start the explain worker on the running loop, using database for explains"""
+        if self._worker is not None:
+            return
+        self._database = database
+        self._loop = asyncio.get_running_loop()
+        self._explain_queue = asyncio.Queue(maxsize=32)
+        self._worker = asyncio.create_task(self._explain_forever())
+
+    async def stop(self):
+        """Stop the explain worker, abandoning queued explains"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._loop = None
+        self._explain_queue = None
+
+    async def _explain_forever(self):
+        while True:
+            entry, command = await self._explain_queue.get()
+            try:
+                explain = await self._database.command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+                entry["explain"] = summarize_explain(explain)
+                self.explained += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                entry["explain"] = {"error": str(e)}
+                self.explain_errors += 1
+
+    # --- Reporting ---
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded commands, slowest first"""
+        with self._lock:
+            entries = list(self._entries)
+        entries.sort(key=lambda entry: entry["duration_ms"], reverse=True)
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._entries)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "buffered": buffered,
+            "max_entries": self._entries.maxlen,
+            "recorded": self.recorded,
+            "explained": self.explained,
+            "explain_errors": self.explain_errors
+        }
+
+# Global slow query recorder, registered on the MongoDB client in mongo_db.connect
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=SLOW_QUERY_THRESHOLD_MS,
+    max_entries=SLOW_QUERY_BUFFER_SIZE,
+    explain_sample_rate=SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+)
@@ -0,0 +1,53 @@
+"""In-memory stand-ins for the async pymongo collections DatabaseManager uses"""
+from typing import Any, Dict, List, Optional
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self._docs)
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    if "$or" in query:
+        return any(_matches(doc, clause) for clause in query["$or"])
+    return all(doc.get(field) == value for field, value in query.items())
+
+class FakeCollection:
+    """Records bulk writes and serves finds from stored docs; set fail_with to make writes raise"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+        self.bulk_writes: List[list] = []
+        self.fail_with: Optional[Exception] = None
+
+    def find(self, query: Dict[str, Any], projection=None, **kwargs) -> FakeCursor:
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query)])
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.bulk_writes.append(list(requests))
+        for request in requests:
+            # Upserts of whole submission documents ($set of every field)
+            update = request._doc.get("$set") if hasattr(request, "_doc") else None
+            if update and "user_id" in update:
+                self.docs = [doc for doc in self.docs if not _matches(doc, request._filter)]
+                self.docs.append(dict(update))
+
+def fake_database_manager():
+    """A DatabaseManager whose collections are FakeCollections"""
+    from database import DatabaseManager
+    manager = DatabaseManager()
+    for name in ("users", "class_submissions", "professor_ratings", "class_rollups", "professor_rollups",
+                 "professor_profiles", "semester_rollups", "major_versions"):
+        setattr(manager, name, FakeCollection(name))
+    return manager
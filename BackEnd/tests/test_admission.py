@@ -0,0 +1,12 @@
+from admission import forwarded_client_ip
+
+def test_forwarded_client_ip_ignores_client_written_entries():
+    # The client prepends a forged address; the platform proxy appends the real one
+    header = "6.6.6.6, 9.9.9.9"
+    assert forwarded_client_ip(header, "10.0.0.2", 1) == "9.9.9.9"
+    assert forwarded_client_ip(header, "10.0.0.2", 2) == "6.6.6.6"
+
+def test_forwarded_client_ip_falls_back_to_peer():
+    assert forwarded_client_ip("6.6.6.6", "10.0.0.2", 0) == "10.0.0.2"
+    assert forwarded_client_ip(None, "10.0.0.2", 1) == "10.0.0.2"
+    assert forwarded_client_ip("9.9.9.9", "10.0.0.2", 2) == "10.0.0.2"
@@ -0,0 +1,45 @@
+import asyncio
+
+import ingest
+from auth_models import ClassDifficultySubmission
+
+def submission(user_id: str, difficulty: int = 5) -> ClassDifficultySubmission:
+    return ClassDifficultySubmission(
+        class_code="COMP 110", class_name="Intro to Programming", major="Computer Science",
+        difficulty_rating=difficulty, professor="Dr. Smith", semester="Fall 2024", user_id=user_id
+    )
+
+def test_failed_flush_requeues_behind_newer_items(monkeypatch):
+    written = []
+    attempts = 0
+
+    async def submit_batch(submissions, ratings):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            # More items arrive while the failing flush is in flight
+            queue.enqueue_submission(submission("late"))
+            queue.enqueue_submission(submission("early", difficulty=9))
+            raise ConnectionError("primary stepped down")
+        written.extend(submissions)
+        return {"difficulty": ["created"] * len(submissions), "professor": []}
+
+    monkeypatch.setattr(ingest.db_manager, "submit_batch", submit_batch)
+    queue = ingest.WriteBehindQueue(flush_interval=0.01, drain_timeout=1)
+
+    async def scenario():
+        await queue.start()
+        queue.enqueue_submission(submission("early"))
+        for _ in range(100):
+            if written:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert not queue._task
+    assert queue.flush_errors == 1
+    # The requeued batch kept its place, and the newer item for the same key won
+    assert [(s.user_id, s.difficulty_rating) for s in written] == [("early", 9), ("late", 5)]
+    assert queue.depth == 0
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from auth_models import ClassDifficultySubmission, ProfessorRating
+from fakes import fake_database_manager
+
+def submission(user_id: str) -> ClassDifficultySubmission:
+    return ClassDifficultySubmission(
+        class_code="COMP 550", class_name="Algorithms", major="Computer Science",
+        difficulty_rating=8, professor="Dr. Smith", semester="Fall 2024", user_id=user_id
+    )
+
+def rating(user_id: str) -> ProfessorRating:
+    return ProfessorRating(
+        professor="Dr. Smith", class_code="COMP 550", rating=4.0, major="Computer Science",
+        semester="Fall 2024", user_id=user_id
+    )
+
+def test_failed_ratings_write_keeps_submission_rollups():
+    manager = fake_database_manager()
+    manager.professor_ratings.fail_with = AutoReconnect("connection reset")
+
+    with pytest.raises(AutoReconnect):
+        asyncio.run(manager.submit_batch([submission("u1")], [rating("u1")]))
+
+    # The stored submission was folded into its rollups and its major's version moved
+    assert len(manager.class_submissions.docs) == 1
+    assert len(manager.class_rollups.bulk_writes) == 1
+    assert len(manager.semester_rollups.bulk_writes) == 1
+    assert [[update._filter for update in batch] for batch in manager.major_versions.bulk_writes] == [
+        [{"_id": "Computer Science"}]
+    ]
+    assert manager.professor_rollups.bulk_writes == []
@@ -44,6 +44,10 @@ if [ ! -f ".env" ]; then
     echo "⚠️  Please edit backend/.env file and set your JWT_SECRET_KEY"
 fi
 
+# Create database indexes
+echo "🔧 Applying database indexes..."
+python migrate.py
+
 # Start backend server
 echo "🚀 Starting FastAPI backend server..."
 echo "Backend will be available at: http://localhost:8000"